@@ -0,0 +1,197 @@
+"""
+Checks split_message on random valid MarkdownV2 messages, with nested entities, code, escapes and
+words longer than a chunk, and on format_infos messages.
+Each chunk must fit the chunk size, be valid MarkdownV2 on its own (no entity left open, no
+dangling escape, no unescaped reserved character), and the chunks must keep all the message's text.
+
+Run from the repository root:
+    python -m benchmarks.check_split_message [--messages 2000] [--seed 0]
+"""
+
+import argparse, random, re, string, sys
+
+from utils.format_helpers import escape_markdown_v2, format_infos, split_message
+
+# Markers of entities that can contain others, and of code entities, which can't
+ENTITY_MARKERS = ["*", "_", "__", "~", "||"]
+CODE_MARKERS = ["`", "```"]
+
+# Characters Telegram requires to be escaped outside code
+RESERVED_CHARACTERS = "_*[]()~`>#+-=|{}.!\\"
+RESERVED_CHARACTERS_PATTERN = re.compile(f"[{re.escape(RESERVED_CHARACTERS)}]")
+
+# Escapes, entity markers (longest first, as Telegram reads them greedily), and other text
+MARKERS = ("```", "`", "||", "__", "_", "*", "~")
+MARKDOWN_V2_TOKEN_PATTERN = re.compile(r"\\[\s\S]?|```|`|\|\||__|[_*~]|[^\\`|_*~]+|\|")
+
+TEXT_CHARACTERS = string.ascii_letters + string.digits + RESERVED_CHARACTERS + "é🙂"
+
+CHUNK_SIZES = (64, 256, 1024, 4096)
+
+
+def parse_markdown_v2(chunk: str) -> tuple[str | None, str]:
+    """Returns the first error in the chunk (None if it's valid MarkdownV2) and its text,
+    without entity markers nor whitespace."""
+    entities = []
+    text = []
+
+    for token in MARKDOWN_V2_TOKEN_PATTERN.finditer(chunk):
+        token, position = token[0], token.start()
+
+        if token == "\\":
+            return "dangling escape at the end", "".join(text)
+
+        if token[0] == "\\":
+            text.append(token)
+        elif entities and entities[-1] in CODE_MARKERS:
+            # Inside code, markers are text, but a ` must be escaped unless it closes the code
+            if token == entities[-1]:
+                entities.pop()
+            elif "`" in token:
+                return f"unescaped ` in code at {position}", "".join(text)
+            else:
+                text.append("".join(token.split()))
+        elif token in MARKERS:
+            if token in entities and entities[-1] != token:
+                return f"{token} closes over {entities[-1]} at {position}", ""
+            if token in entities:
+                entities.pop()
+            else:
+                entities.append(token)
+        elif reserved := RESERVED_CHARACTERS_PATTERN.search(token):
+            return f"unescaped {reserved[0]} at {position + reserved.start()}", ""
+        else:
+            text.append("".join(token.split()))
+
+    if entities:
+        return f"entities left open: {' '.join(entities)}", "".join(text)
+
+    return None, "".join(text)
+
+
+def generate_text(rng: random.Random, length: int) -> str:
+    """Returns escaped text with spaces, newlines and sometimes a word longer than a chunk."""
+    if rng.random() < 0.05:
+        return escape_markdown_v2("".join(rng.choices(TEXT_CHARACTERS, k=length)))
+
+    words = []
+    while length > 0:
+        word = "".join(rng.choices(TEXT_CHARACTERS, k=min(length, rng.randint(1, 12))))
+        words.append(word + rng.choice(" " * 8 + "\n"))
+        length -= len(words[-1])
+
+    return escape_markdown_v2("".join(words))
+
+
+def generate_code(rng: random.Random, length: int) -> str:
+    """Returns code content, in which only ` and \\ are escaped."""
+    code = "".join(rng.choices(TEXT_CHARACTERS + " \n", k=length))
+    return code.replace("\\", "\\\\").replace("`", "\\`")
+
+
+def generate_message(rng: random.Random, length: int, open_markers=()) -> str:
+    """Returns valid MarkdownV2 of about length characters, with randomly nested entities.
+    Entities start with a letter and end with a letter and a space, so their markers are never
+    next to each other."""
+    parts = []
+
+    while length > 0:
+        part_length = rng.randint(1, max(1, min(length, 400)))
+        roll = rng.random()
+
+        if roll < 0.6:
+            parts.append(generate_text(rng, part_length))
+        elif roll < 0.7:
+            marker = rng.choice(CODE_MARKERS)
+            parts.append(f"{marker}a{generate_code(rng, part_length)}a{marker} ")
+        elif markers := [m for m in ENTITY_MARKERS if m not in open_markers]:
+            # "_" right inside "__" (or the opposite) would be ambiguous
+            if "_" in open_markers or "__" in open_markers:
+                markers = [m for m in markers if m not in ("_", "__")]
+            marker = rng.choice(markers) if markers else None
+            if marker:
+                inner = generate_message(rng, part_length // 2, (*open_markers, marker))
+                parts.append(f"{marker}a{inner}a{marker} ")
+
+        length -= part_length
+
+    return "".join(parts)
+
+
+def generate_infos_message(rng: random.Random, length: int) -> str:
+    """Returns a format_infos message of a video with a long description and chapters list."""
+    words = [
+        "".join(rng.choices(TEXT_CHARACTERS, k=rng.randint(1, 10)))
+        for _ in range(length // 6)
+    ]
+    description = " ".join(
+        word + ("\n" if i % 15 == 14 else "") for i, word in enumerate(words)
+    )
+    chapters = [
+        {
+            "title": " ".join(words[i : i + 4]),
+            "start_time": i * 10,
+            "end_time": i * 10 + 10,
+        }
+        for i in range(0, len(words), 4)
+    ]
+
+    return format_infos(
+        {"title": "Video", "description": description, "chapters": chapters},
+        ["title", "description", "chapters"],
+    )
+
+
+def check_message(message: str, chunk_size: int) -> str | None:
+    """Returns the first property split_message breaks on the message, or None."""
+    error, message_text = parse_markdown_v2(message)
+    if error:
+        return f"generated message is invalid: {error}"
+
+    chunks = split_message(message, chunk_size)
+    chunks_text = []
+
+    for number, chunk in enumerate(chunks, 1):
+        if len(chunk) > chunk_size:
+            return f"chunk {number} has {len(chunk)} characters"
+
+        error, chunk_text = parse_markdown_v2(chunk)
+        if error:
+            return f"chunk {number} is invalid: {error}: {chunk!r}"
+
+        chunks_text.append(chunk_text)
+
+    if "".join(chunks_text) != message_text:
+        return "chunks don't have the message's text"
+
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failures = 0
+    for seed in range(args.seed, args.seed + args.messages):
+        # Each message has its own seed, so a failure can be reproduced alone
+        rng = random.Random(seed)
+        chunk_size = rng.choice(CHUNK_SIZES)
+        length = rng.randint(0, 5 * chunk_size)
+
+        if seed % 4:
+            message = generate_message(rng, length)
+        else:
+            message = generate_infos_message(rng, length)
+
+        if error := check_message(message, chunk_size):
+            failures += 1
+            print(f"Seed {seed}, {chunk_size} per chunk: {error}")
+
+    print(f"{args.messages} messages checked, {failures} failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
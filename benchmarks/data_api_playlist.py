@@ -0,0 +1,134 @@
+"""
+Benchmarks the Data API playlist listing backend on a synthetic playlist, twice, to show the cost
+of a repeat listing with ETags.
+A local server replays generated playlistItems.list responses, so no network access is needed.
+The yt_dlp backend isn't measured offline, as it can't be pointed at a local server.
+With --live PLAYLIST_ID, both backends list a real playlist instead (needs network access and YOUTUBE_API_KEY).
+
+Run from the repository root:
+    python -m benchmarks.data_api_playlist [--videos 5000] [--live PLAYLIST_ID]
+"""
+
+import argparse, asyncio, hashlib, json, tempfile, time
+
+from aiohttp import web
+from contextlib import aclosing
+
+import utils.yt_helpers as yt_helpers
+
+from utils.extraction_engine import extraction_engine
+from utils.http_sessions import http_sessions
+from utils.metadata_store import metadata_store
+
+
+def build_pages(videos_count: int) -> dict[str, dict]:
+    """Returns generated playlistItems.list responses (with the fields the backend asks for), by page token."""
+    pages = {}
+    videos_ids = [f"{i:011d}"[-11:] for i in range(videos_count)]
+
+    for page_number, start in enumerate(range(0, videos_count, 50)):
+        page_token = f"PAGE{page_number}" if page_number else ""
+        page = {
+            "items": [
+                {"contentDetails": {"videoId": video_id}}
+                for video_id in videos_ids[start : start + 50]
+            ]
+        }
+        if start + 50 < videos_count:
+            page["nextPageToken"] = f"PAGE{page_number + 1}"
+
+        page["etag"] = hashlib.md5(json.dumps(page).encode()).hexdigest()
+        pages[page_token] = page
+
+    return pages
+
+
+async def start_fixture_server(pages: dict[str, dict], counters: dict) -> web.AppRunner:
+    async def playlist_items(request: web.Request) -> web.Response:
+        counters["requests"] += 1
+        page = pages[request.query.get("pageToken", "")]
+
+        if request.headers.get("If-None-Match") == page["etag"]:
+            counters["not modified"] += 1
+            return web.Response(status=304)
+
+        response = web.json_response(page, headers={"ETag": page["etag"]})
+        response.enable_compression()
+        counters["bytes"] += len(json.dumps(page))
+        return response
+
+    app = web.Application()
+    app.router.add_get("/youtube/v3/playlistItems", playlist_items)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 8765).start()
+    return runner
+
+
+async def time_listing(iter_pages) -> tuple[int, float]:
+    """Returns the number of listed videos and the time it took, in seconds."""
+    start_time = time.perf_counter()
+    videos_count = 0
+
+    async with aclosing(iter_pages) as pages:
+        async for page in pages:
+            videos_count += len(page)
+
+    return videos_count, time.perf_counter() - start_time
+
+
+async def benchmark_fixture(videos_count: int) -> None:
+    counters = {"requests": 0, "not modified": 0, "bytes": 0}
+    runner = await start_fixture_server(build_pages(videos_count), counters)
+    yt_helpers.DATA_API_URL = "http://127.0.0.1:8765/youtube/v3"
+    yt_helpers.YOUTUBE_API_KEY = yt_helpers.YOUTUBE_API_KEY or "benchmark"
+
+    try:
+        for scan in ("first", "repeat"):
+            counters.update(requests=0, bytes=0, **{"not modified": 0})
+            listed, seconds = await time_listing(
+                yt_helpers.iter_playlist_videos_urls_data_api("PLbenchmark")
+            )
+            print(
+                f"data_api, {scan} listing: {listed} videos in {seconds:.3f}s, "
+                f"{counters['requests']} requests ({counters['not modified']} not modified), "
+                f"{counters['bytes']} response bytes before compression"
+            )
+    finally:
+        await runner.cleanup()
+
+
+async def benchmark_live(playlist_id: str) -> None:
+    for name, iter_pages in (
+        ("yt_dlp", yt_helpers.iter_playlist_videos_urls_yt_dlp),
+        ("data_api", yt_helpers.iter_playlist_videos_urls_data_api),
+        ("data_api (repeat)", yt_helpers.iter_playlist_videos_urls_data_api),
+    ):
+        listed, seconds = await time_listing(iter_pages(playlist_id))
+        print(f"{name}, live listing: {listed} videos in {seconds:.3f}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--videos", type=int, default=5000)
+    parser.add_argument("--live", metavar="PLAYLIST_ID")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        metadata_store.path = f"{directory}/metadata.sqlite3"
+        await metadata_store.start()
+        await http_sessions.start()
+
+        try:
+            if args.live:
+                await benchmark_live(args.live)
+            else:
+                await benchmark_fixture(args.videos)
+        finally:
+            await http_sessions.close()
+            await metadata_store.close()
+            await extraction_engine.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+"""
+Benchmarks split_message against the previous implementation, on very long descriptions and chapter lists.
+
+Run from the repository root:
+    python -m benchmarks.split_message
+"""
+
+import random, re, timeit
+
+from utils.format_helpers import format_infos, split_message
+
+
+class NoProgressError(Exception):
+    pass
+
+
+def previous_split_message(message: str, chunk_size: int = 4096) -> list[str]:
+    chunks = []
+
+    while message:
+        if len(message) <= chunk_size:
+            chunks.append(message)
+            break
+
+        split_position = message.rfind("\n", 0, chunk_size)
+
+        if split_position == -1:
+            split_position = message.rfind(" ", 0, chunk_size)
+
+            if split_position == -1:
+                split_position = chunk_size
+
+        chunk = message[:split_position]
+
+        open_bold = chunk.count("*") % 2 != 0
+        open_italic = chunk.count("_") % 2 != 0
+        open_bolditalic = chunk.count("***") % 2 != 0
+
+        if open_bold or open_italic or open_bolditalic:
+            if safe_split := re.search(r"([*_]+)", chunk[::-1]):
+                split_position -= safe_split.start() + 1
+                chunk = message[:split_position]
+
+        # Previously looped forever here, the message being left unchanged
+        if split_position <= 0:
+            raise NoProgressError
+
+        chunks.append(chunk.strip())
+        message = message[split_position:].lstrip()
+
+    return chunks
+
+
+def generate_words(count: int) -> list[str]:
+    """Returns words like in descriptions, some with punctuation or MarkdownV2 characters."""
+    random.seed(count)
+    return [
+        "".join(random.choices("abcdefghijklmnopqrstuvwxyz", k=random.randint(1, 10)))
+        + random.choices(["", ".", ",", "!", "-", "_", "*"], [80, 6, 6, 2, 3, 2, 1])[0]
+        for _ in range(count)
+    ]
+
+
+def generate_messages(length: int) -> dict[str, str]:
+    """Returns format_infos messages of a long description and a long chapters list."""
+    words = generate_words(length // 6)
+    description = " ".join(
+        word + ("\n" if i % 15 == 14 else "") for i, word in enumerate(words)
+    )
+
+    chapters = []
+    for i in range(0, len(words), 4):
+        chapters.append(
+            {
+                "title": " ".join(words[i : i + 4]),
+                "start_time": i * 10,
+                "end_time": i * 10 + 10,
+            }
+        )
+
+    return {
+        "description": format_infos(
+            {"title": "Video", "description": description}, ["title", "description"]
+        ),
+        "chapters": format_infos({"chapters": chapters}, ["chapters"]),
+    }
+
+
+def main():
+    for length in (10_000, 100_000, 1_000_000):
+        for name, message in generate_messages(length).items():
+            for chunk_size in (4096, 1024):
+                runs = max(1, 1_000_000 // len(message))
+                for function_name, function in (
+                    ("previous", previous_split_message),
+                    ("split_message", split_message),
+                ):
+                    try:
+                        chunks_count = len(function(message, chunk_size))
+                    except NoProgressError:
+                        print(
+                            f"{name} of {len(message)} characters, {chunk_size} per chunk, "
+                            f"{function_name}: never returns"
+                        )
+                        continue
+
+                    seconds = min(
+                        timeit.repeat(
+                            lambda: function(message, chunk_size), number=runs, repeat=3
+                        )
+                    )
+                    print(
+                        f"{name} of {len(message)} characters, {chunk_size} per chunk, "
+                        f"{function_name}: {seconds / runs * 1e3:.2f} ms ({chunks_count} chunks)"
+                    )
+
+
+if __name__ == "__main__":
+    main()
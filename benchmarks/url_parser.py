@@ -0,0 +1,123 @@
+"""
+Benchmarks parse_youtube_url against the previous three-function URL validation.
+
+Run from the repository root:
+    python -m benchmarks.url_parser
+"""
+
+import re, timeit
+
+from utils.yt_helpers import parse_youtube_url
+
+# Real and malformed URLs, as users send them
+URLS = [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtube.com/watch?v=dQw4w9WgXcQ&t=42s",
+    "https://m.youtube.com/watch?feature=share&v=dQw4w9WgXcQ",
+    "www.youtube.com/watch?v=dQw4w9WgXcQ&list=PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI",
+    "https://www.youtube.com/shorts/aqz-KE-bpKQ",
+    "https://www.youtube.com/shorts/aqz-KE-bpKQ?feature=share",
+    "https://youtu.be/dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ?si=B_RZg_I-lLaa7UU-",
+    "https://www.youtube.com/playlist?list=PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI",
+    "https://youtube.com/playlist?list=PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI&si=abc",
+    "https://www.youtube.com/watch?v=short",
+    "https://www.youtube.com/watch?list=PLFgquLnL59alCl_2TQvOiD5Vgm1hCaGSI",
+    "https://www.youtube.com/playlist?feature=share",
+    "https://www.youtube.com/channel/UC38IQsAvIsxxjztdMZQtwHA",
+    "https://www.youtube.com/@YouTube",
+    "https://vimeo.com/76979871",
+    "https://youtu.be/",
+    "not a url at all",
+    "",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ" + "&x=y" * 50,
+]
+
+
+def previous_is_valid_youtube_url_format(url: str) -> bool:
+    pattern = r"""
+        ^(?:https?://)?                  # Optional https
+        (?:
+            (?:www\.|m\.)?youtube\.com   # Optional www. or m. subdomains
+            /(?:
+                watch                    # Video URLs
+                (?:\?.*?)?               # Optional extra parameters before v or list
+                (?=.*[?&]v=([\w-]{11}))  # Video ID (v=) required somewhere
+                (?:[?&][\w-]+=[\w-]*)*   # Optional extra parameters
+            |
+                shorts/([\w-]{11})       # Shorts URLs
+                (?:\?.*)?                # Optional extra parameters
+            |
+                playlist\?               # Playlist URLs
+                (?:[?&]?list=([\w-]+))   # Playlist ID (list=) required somewhere
+                (?:[?&][\w-]+=[\w-]*)*   # Optional extra parameters
+            )
+        |
+            youtu\.be/([\w-]{11})        # Shortened URLs
+            (?:\?.*)?                    # Optional extra parameters
+        )
+        $"""
+
+    pattern = re.compile(pattern, re.VERBOSE | re.IGNORECASE)
+    return bool(pattern.match(url))
+
+
+def previous_get_youtube_url_type(url: str) -> str | None:
+    if "playlist" in url and re.search(r"[?&]list=([a-zA-Z0-9_-]+)", url):
+        return "playlist"
+
+    if re.search(
+        r"(?:youtube\.com\/(?:[^\/]+\/[^\/]+\/|(?:v|shorts)\/|.*[?&]v=)|youtu\.be\/)([a-zA-Z0-9_-]{11})",
+        url,
+    ):
+        return "video"
+
+    return None
+
+
+def previous_get_youtube_url_id(url: str, yt_type: str) -> str | None:
+    patterns = {
+        "playlist": r"[?&]list=([a-zA-Z0-9_-]+)",
+        "video": r"(?:youtube\.com\/(?:[^\/]+\/[^\/]+\/|(?:v|shorts)\/|.*[?&]v=)|youtu\.be\/)([a-zA-Z0-9_-]{11})",
+    }
+
+    match = re.search(patterns.get(yt_type), url)
+
+    return match.group(1) if match else None
+
+
+def previous_parse(url: str) -> tuple[str, str] | None:
+    """The previous validation steps of validate_youtube_url."""
+    if not previous_is_valid_youtube_url_format(url):
+        return None
+
+    if not (
+        (url_type := previous_get_youtube_url_type(url))
+        and (url_id := previous_get_youtube_url_id(url, url_type))
+    ):
+        return None
+
+    return url_type, url_id
+
+
+def parse(url: str) -> tuple[str, str] | None:
+    return (parsed_url := parse_youtube_url(url)) and parsed_url[:2]
+
+
+def main():
+    for url in URLS:
+        if (previous := previous_parse(url)) != (current := parse(url)):
+            print(f"Different result for {url!r}: {previous} before, {current} now")
+
+    for name, function in (("previous", previous_parse), ("parse_youtube_url", parse)):
+        runs = 1000
+        seconds = min(
+            timeit.repeat(
+                lambda: [function(url) for url in URLS], number=runs, repeat=5
+            )
+        )
+        print(f"{name}: {seconds / runs / len(URLS) * 1e6:.2f} µs per URL")
+
+
+if __name__ == "__main__":
+    main()
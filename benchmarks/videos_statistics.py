@@ -0,0 +1,106 @@
+"""
+Benchmarks VideosStatistics against the previous loop of send_infos, which only computed totals and averages.
+Collecting the videos and computing the report are timed apart.
+
+Run from the repository root:
+    python -m benchmarks.videos_statistics
+"""
+
+import random, timeit
+
+from utils.bot_data import STATISTICAL_INFO_OPTIONS
+from utils.videos_statistics import VideosStatistics
+
+
+def generate_videos_infos(video_count: int) -> list[dict | None]:
+    """Returns infos like yt_dlp's, some videos missing some infos or all of them."""
+    random.seed(video_count)
+    videos_infos = []
+
+    for _ in range(video_count):
+        if random.random() < 0.02:
+            videos_infos.append(None)
+            continue
+
+        views_count = random.randint(0, 10_000_000)
+        videos_infos.append(
+            {
+                "duration": random.randint(10, 36_000),
+                "views count": views_count,
+                "likes count": (
+                    random.randint(0, views_count // 10)
+                    if random.random() > 0.1
+                    else None
+                ),
+                "comments count": (
+                    random.randint(0, views_count // 100)
+                    if random.random() > 0.2
+                    else None
+                ),
+            }
+        )
+
+    return videos_infos
+
+
+def previous_statistics(videos_infos: list[dict | None]) -> tuple[dict, dict]:
+    total_statistics_infos = {option: 0 for option in STATISTICAL_INFO_OPTIONS}
+
+    for video_infos in videos_infos:
+        video_infos = video_infos or {}
+        for option in STATISTICAL_INFO_OPTIONS:
+            if isinstance(video_infos.get(option), (int, float)):
+                total_statistics_infos[option] += video_infos[option]
+
+    average_statistics_infos = {
+        info: int(info_value) if info_value.is_integer() else round(info_value, 2)
+        for info, info_value in (
+            (total_info, total_statistics_infos[total_info] / len(videos_infos))
+            for total_info in total_statistics_infos
+        )
+    }
+
+    return total_statistics_infos, average_statistics_infos
+
+
+def collect_statistics(videos_infos: list[dict | None]) -> VideosStatistics:
+    statistics = VideosStatistics(STATISTICAL_INFO_OPTIONS)
+    for video_infos in videos_infos:
+        statistics.add(video_infos)
+
+    return statistics
+
+
+def main():
+    for video_count in (100, 1_000, 10_000, 100_000):
+        videos_infos = generate_videos_infos(video_count)
+        videos_urls = [
+            f"https://www.youtube.com/watch?v={i:011d}" for i in range(video_count)
+        ]
+        statistics = collect_statistics(videos_infos)
+
+        if (
+            previous_statistics(videos_infos)[0]
+            != statistics.report(videos_urls)["Total"]
+        ):
+            print(f"Different totals for {video_count} videos")
+
+        # In send_infos, videos are collected one by one as their infos are fetched
+        runs = max(1, 10_000 // video_count)
+        for name, function in (
+            (
+                "previous loop (totals, averages)",
+                lambda: previous_statistics(videos_infos),
+            ),
+            ("VideosStatistics.add", lambda: collect_statistics(videos_infos)),
+            (
+                "VideosStatistics.report (full report)",
+                lambda: statistics.report(videos_urls),
+            ),
+        ):
+            seconds = min(timeit.repeat(function, number=runs, repeat=7)) / runs
+            print(f"{video_count} videos, {name}: {seconds * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
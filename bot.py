@@ -2,7 +2,7 @@
 Main entry point for the Telegram bot.
 
 Initializes the bot application, sets up commands and conversation handlers,
-and starts polling for updates.
+and starts receiving updates, through polling or a webhook.
 
 Run this script to start the bot.
 """
@@ -18,9 +18,20 @@ from telegram.ext import (
     filters,
 )
 
-from config import BOT_TOKEN
+from config import (
+    BOT_TOKEN,
+    MAX_CONCURRENT_UPDATES,
+    MAX_PENDING_UPDATES,
+    UPDATE_MODE,
+    WEBHOOK_LISTEN,
+    WEBHOOK_MAX_CONNECTIONS,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET_TOKEN,
+    WEBHOOK_URL,
+)
 
-from handlers.common_handlers import cancel, error_handler
+from handlers.common_handlers import cancel, error_handler, request_cancel
 from handlers.conversation_handlers import (
     get_selected_info_options,
     get_selected_playlist_videos,
@@ -37,17 +48,51 @@ from utils.bot_data import (
     SELECT_VIDEOS,
     VIDEO_INFO_OPTIONS,
 )
+from utils.extraction_engine import extraction_engine
+from utils.http_sessions import http_sessions
+from utils.metadata_store import metadata_store
+from utils.persistence import persistence
+from utils.send_scheduler import send_scheduler
+from utils.update_processor import UserOrderedUpdateProcessor
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
 )
 
 
+async def post_init(application):
+    """Starts shared resources before the bot begins receiving updates."""
+    await extraction_engine.start()
+    await metadata_store.start()
+    await http_sessions.start()
+
+
+async def post_shutdown(application):
+    """Releases shared resources after the bot stops."""
+    await http_sessions.close()
+    await metadata_store.close()
+    await extraction_engine.shutdown()
+
+
 def main():
-    application = ApplicationBuilder().token(BOT_TOKEN).build()
+    application = (
+        ApplicationBuilder()
+        .token(BOT_TOKEN)
+        .rate_limiter(send_scheduler)
+        .persistence(persistence)
+        .concurrent_updates(
+            UserOrderedUpdateProcessor(MAX_CONCURRENT_UPDATES, MAX_PENDING_UPDATES)
+        )
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
 
     application.add_error_handler(error_handler)
 
+    # Runs before all other handlers, stopping the user's running operations
+    application.add_handler(CommandHandler("cancel", request_cancel), group=-1)
+
     help_handlers = [
         CommandHandler("help", help),
         CommandHandler("help_url", help_url),
@@ -83,12 +128,34 @@ def main():
             ],
         },
         fallbacks=[CommandHandler("cancel", cancel), CommandHandler("start", start)],
+        name="main_conversation",
+        persistent=True,
     )
 
     for handler in help_handlers + extra_command_handlers + [conversation_handler]:
         application.add_handler(handler)
 
-    application.run_polling()
+    if UPDATE_MODE == "webhook":
+        run_webhook(application)
+    else:
+        application.run_polling()
+
+
+def run_webhook(application):
+    """Serves the webhook until stopped, then finishes processing received updates before exiting.
+    The webhook stays registered on Telegram, so other instances behind the same URL keep receiving updates.
+    """
+    if not WEBHOOK_URL or not WEBHOOK_SECRET_TOKEN:
+        raise ValueError("Webhook mode needs WEBHOOK_URL and WEBHOOK_SECRET_TOKEN")
+
+    application.run_webhook(
+        listen=WEBHOOK_LISTEN,
+        port=WEBHOOK_PORT,
+        url_path=WEBHOOK_PATH,
+        webhook_url=f"{WEBHOOK_URL.rstrip('/')}/{WEBHOOK_PATH}",
+        secret_token=WEBHOOK_SECRET_TOKEN,
+        max_connections=WEBHOOK_MAX_CONNECTIONS,
+    )
 
 
 if __name__ == "__main__":
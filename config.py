@@ -8,3 +8,91 @@ from os import getenv
 
 BOT_TOKEN = getenv("BOT_TOKEN")
 YOUTUBE_API_KEY = getenv("YOUTUBE_API_KEY")
+
+# Maximum number of reusable yt_dlp instances kept for each options profile
+YDL_POOL_SIZE = int(getenv("YDL_POOL_SIZE", 10))
+
+# Executor used for yt_dlp extractions: "thread" or "process" (spreads extractions across CPU cores)
+EXTRACTION_MODE = getenv("EXTRACTION_MODE", "thread")
+# Number of threads or processes running extractions
+EXTRACTION_WORKERS = int(getenv("EXTRACTION_WORKERS", 10))
+# Maximum number of queued and running extractions, above which new ones are refused
+EXTRACTION_MAX_PENDING = int(getenv("EXTRACTION_MAX_PENDING", 200))
+
+# How to detect hidden playlist videos: "yt_dlp" (one extraction per video)
+# or "data_api" (YouTube Data API, 50 videos per request, needs YOUTUBE_API_KEY)
+AVAILABILITY_BACKEND = getenv("AVAILABILITY_BACKEND", "yt_dlp")
+# How to list playlist videos: "yt_dlp" (scrapes YouTube pages)
+# or "data_api" (YouTube Data API, 50 videos per request, needs YOUTUBE_API_KEY)
+PLAYLIST_BACKEND = getenv("PLAYLIST_BACKEND", "yt_dlp")
+
+# Limits of the in-memory video metadata cache
+VIDEO_CACHE_MAX_ENTRIES = int(getenv("VIDEO_CACHE_MAX_ENTRIES", 5000))
+VIDEO_CACHE_MAX_BYTES = int(getenv("VIDEO_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Seconds until cached static video infos (title, description...) expire
+VIDEO_CACHE_STATIC_TTL = int(getenv("VIDEO_CACHE_STATIC_TTL", 24 * 60 * 60))
+# Seconds until cached views, likes and comments counts expire
+VIDEO_CACHE_COUNTERS_TTL = int(getenv("VIDEO_CACHE_COUNTERS_TTL", 10 * 60))
+
+# SQLite file keeping video, playlist and channel metadata across restarts
+METADATA_STORE_PATH = getenv("METADATA_STORE_PATH", "metadata.sqlite3")
+# Seconds until stored metadata expires
+METADATA_STORE_TTL = int(getenv("METADATA_STORE_TTL", 24 * 60 * 60))
+# Maximum number of rows kept per table (videos, playlists, channels)
+METADATA_STORE_MAX_ROWS = int(getenv("METADATA_STORE_MAX_ROWS", 100_000))
+# Seconds between writes of queued metadata to the file
+METADATA_STORE_FLUSH_INTERVAL = int(getenv("METADATA_STORE_FLUSH_INTERVAL", 5))
+# Seconds between removals of expired rows and file vacuums
+METADATA_STORE_COMPACT_INTERVAL = int(
+    getenv("METADATA_STORE_COMPACT_INTERVAL", 6 * 60 * 60)
+)
+
+# Number of videos fetched ahead while sending videos infos
+SEND_INFOS_PREFETCH = int(getenv("SEND_INFOS_PREFETCH", 5))
+
+# Number of playlist videos listed at a time with yt_dlp (the Data API lists 50),
+# checked while the next ones are listed
+PLAYLIST_PAGE_SIZE = int(getenv("PLAYLIST_PAGE_SIZE", 100))
+
+# Connection pooling of the shared HTTP sessions
+HTTP_LIMIT_PER_HOST = int(getenv("HTTP_LIMIT_PER_HOST", 20))
+HTTP_KEEPALIVE_TIMEOUT = int(getenv("HTTP_KEEPALIVE_TIMEOUT", 30))
+HTTP_DNS_CACHE_TTL = int(getenv("HTTP_DNS_CACHE_TTL", 300))
+
+# Telegram requests per second allowed globally, per private chat and per group chat
+SEND_GLOBAL_RATE = float(getenv("SEND_GLOBAL_RATE", 30))
+SEND_CHAT_RATE = float(getenv("SEND_CHAT_RATE", 1))
+SEND_GROUP_RATE = float(getenv("SEND_GROUP_RATE", 20 / 60))
+# Requests that can be sent at once to a private chat after it was idle
+SEND_CHAT_BURST = int(getenv("SEND_CHAT_BURST", 3))
+# Times a request is rescheduled after Telegram answers with RetryAfter
+SEND_MAX_RETRIES = int(getenv("SEND_MAX_RETRIES", 3))
+
+# Maximum number of Telegram updates processed at the same time (across all users)
+MAX_CONCURRENT_UPDATES = int(getenv("MAX_CONCURRENT_UPDATES", 256))
+# Maximum number of Telegram updates accepted at the same time, processed or waiting for
+# the same user's previous updates
+MAX_PENDING_UPDATES = int(getenv("MAX_PENDING_UPDATES", 4096))
+
+# How the bot receives updates: "polling" or "webhook"
+UPDATE_MODE = getenv("UPDATE_MODE", "polling")
+# Public HTTPS URL Telegram sends updates to, in webhook mode (e.g. https://example.com)
+WEBHOOK_URL = getenv("WEBHOOK_URL")
+# Secret Telegram sends in every webhook request, so other requests are rejected
+WEBHOOK_SECRET_TOKEN = getenv("WEBHOOK_SECRET_TOKEN")
+# Address, port and path the webhook listener is served on
+WEBHOOK_LISTEN = getenv("WEBHOOK_LISTEN", "127.0.0.1")
+WEBHOOK_PORT = int(getenv("WEBHOOK_PORT", 8443))
+WEBHOOK_PATH = getenv("WEBHOOK_PATH", "telegram")
+# Maximum number of simultaneous connections Telegram opens to the webhook
+WEBHOOK_MAX_CONNECTIONS = int(getenv("WEBHOOK_MAX_CONNECTIONS", 40))
+
+# SQLite file keeping conversations and user data across restarts
+PERSISTENCE_PATH = getenv("PERSISTENCE_PATH", "persistence.sqlite3")
+# Seconds between writes of the changed conversations and user data
+PERSISTENCE_UPDATE_INTERVAL = int(getenv("PERSISTENCE_UPDATE_INTERVAL", 5))
+
+# Maximum width and height of sent thumbnails, in pixels (bigger ones are downscaled)
+THUMBNAIL_MAX_SIZE = int(getenv("THUMBNAIL_MAX_SIZE", 1280))
+# Width of the thumbnail variant downloaded: the smallest at least this wide, in pixels
+THUMBNAIL_TARGET_WIDTH = int(getenv("THUMBNAIL_TARGET_WIDTH", 640))
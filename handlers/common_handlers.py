@@ -2,48 +2,59 @@
 Telegram common handlers and helper functions used across multiple Telegram bot commands.
 
 Includes:
-- /cancel command handler.
+- /cancel command handlers.
 - General error handler.
 - Shared helper functions:
     - URL validation steps.
     - Thumbnail sending logic.
-    - Cancellation checks during long operations.
+    - Cancellation of long operations through /cancel.
 """
 
-import asyncio
+import functools
 
 from telegram import Update
-from telegram.error import BadRequest, TimedOut
-from telegram.ext import ContextTypes, ConversationHandler
-
-from utils.image_helpers import convert_image_to_jpeg, fetch_video_thumbnail
-from utils.yt_helpers import (
-    get_videos_urls,
-    get_youtube_url_id,
-    get_youtube_url_type,
-    is_valid_youtube_url_format,
+from telegram.error import BadRequest, RetryAfter, TimedOut
+from telegram.ext import ApplicationHandlerStop, ContextTypes, ConversationHandler
+
+from utils.cancellation import cancellation_registry
+from utils.extraction_engine import ExtractionBusyError
+from utils.image_helpers import (
+    fetch_video_thumbnail,
+    get_thumbnail_file_id,
+    store_thumbnail_file_id,
+    thumbnail_processor,
 )
+from utils.send_scheduler import INTERACTIVE_PRIORITY
+from utils.yt_helpers import get_video_infos, get_videos_urls, parse_youtube_url
 
 
 async def validate_youtube_url(
-    url: str, context: ContextTypes.DEFAULT_TYPE
+    url: str,
+    context: ContextTypes.DEFAULT_TYPE,
+    lazy_video: bool = False,
+    lazy_playlist: bool = False,
 ) -> str | None:
     """Validates the provided URL by performing a series of checks. 
     Returns an appropriate error message if any validation fails, or None if all checks pass. 
-    Stores relevant data (url_type, url_id, videos_urls) in user data via context."""
-    if not is_valid_youtube_url_format(url):
+    Stores relevant data (url_type, url_id, videos_urls) in user data via context.
+    A video is checked by fetching its infos (cached for the next steps), a playlist by listing its videos.
+    If lazy_video or lazy_playlist, the check (and listing) is left to the caller."""
+    if not (parsed_url := parse_youtube_url(url)):
         return "❌ Invalid YouTube URL format"
 
-    if not (
-        (url_type := get_youtube_url_type(url))
-        and (url_id := get_youtube_url_id(url, url_type))
-    ):
-        return "❌ Invalid YouTube URL"
+    context.user_data["url_type"] = parsed_url.type
+    context.user_data["url_id"] = parsed_url.id
+
+    if parsed_url.type == "video":
+        if not lazy_video and not await get_video_infos(parsed_url.canonical_url):
+            return "❌ Unavailable YouTube URL"
 
-    context.user_data["url_type"] = url_type
-    context.user_data["url_id"] = url_id
+        videos_urls = [parsed_url.canonical_url]
 
-    if not (videos_urls := await get_videos_urls(url_type, url_id)):
+    elif lazy_playlist:
+        return None
+
+    elif not (videos_urls := await get_videos_urls(parsed_url.type, parsed_url.id)):
         return "❌ Unavailable YouTube URL"
 
     context.user_data["videos_urls"] = videos_urls
@@ -51,78 +62,102 @@ async def validate_youtube_url(
     return None
 
 
-async def send_thumbnail_photo(update, context, thumbnail_url, caption) -> bool:
-    """Download the thumbnail and try to send it as a photo with caption.
+async def send_thumbnail_photo(
+    update,
+    context,
+    thumbnail_url,
+    caption,
+    priority=INTERACTIVE_PRIORITY,
+    thumbnails=None,
+) -> bool:
+    """Send the thumbnail as a photo with caption, reusing its Telegram file ID if it was already sent.
+    Else, download it (the best fitting of its variants, if given) and upload it.
     Return True if thumbnail was succesfully sent with caption.
     Else, return False, and, if possible, send only the thumbnail in a message."""
-    if not (original_image_data := await fetch_video_thumbnail(thumbnail_url)):
+    if file_id := await get_thumbnail_file_id(thumbnail_url):
+        try:
+            was_caption_sent, _ = await send_photo_with_caption(
+                update, context, file_id, caption, priority
+            )
+            return was_caption_sent
+
+        # Telegram doesn't accept the file ID anymore, so upload the thumbnail again
+        except BadRequest as e:
+            print(f"Error sending thumbnail by file ID: {e}")
+            store_thumbnail_file_id(thumbnail_url, None)
+
+    if not (
+        original_image_data := await fetch_video_thumbnail(thumbnail_url, thumbnails)
+    ):
         return False
 
-    if not (processed_image := convert_image_to_jpeg(original_image_data)):
+    if not (processed_image := await thumbnail_processor.process(original_image_data)):
         return False
 
+    # The same bytes are reused if the photo has to be sent again without caption
+    was_caption_sent, file_id = await send_photo_with_caption(
+        update, context, processed_image, caption, priority
+    )
+    store_thumbnail_file_id(thumbnail_url, file_id)
+
+    return was_caption_sent
+
+
+async def send_photo_with_caption(
+    update, context, photo, caption, priority
+) -> tuple[bool, str]:
+    """Send the photo (bytes or Telegram file ID) with caption, or only the photo if that fails.
+    Return (was caption sent, file ID of the sent photo)."""
     try:
-        await context.bot.send_photo(
+        message = await context.bot.send_photo(
             chat_id=update.effective_chat.id,
-            photo=processed_image,
+            photo=photo,
             caption=caption,
             parse_mode="MarkdownV2",
             disable_notification=True,
+            rate_limit_args=priority,
         )
-        return True
+        return True, message.photo[-1].file_id
 
     # Limit for Telegram caption length is 1024 characters
     # Some videos have long captions, so send only the thumbnail
     except BadRequest as e:
         print(f"Error sending photo with caption: {e}")
 
-        if not (processed_image := convert_image_to_jpeg(original_image_data)):
-            return False
-
-        await context.bot.send_photo(
-            chat_id=update.effective_chat.id,
-            photo=processed_image,
-            disable_notification=True,
-        )
-        return False
+    message = await context.bot.send_photo(
+        chat_id=update.effective_chat.id,
+        photo=photo,
+        disable_notification=True,
+        rate_limit_args=priority,
+    )
+    return False, message.photo[-1].file_id
 
 
-async def check_for_cancel(
-    update: Update, context: ContextTypes.DEFAULT_TYPE, stop_event: asyncio.Event
-):
-    """Continuously check for /cancel while processing messages."""
-    user_id = update.effective_user.id
-
-    while not stop_event.is_set():
-        try:
-            new_update = await context.application.update_queue.get()
-            if not new_update.message:
-                continue
+def cancellable(handler):
+    """Runs the handler with an extra cancel_event argument, set if the user sends /cancel in the chat.
+    If the handler is cancelled, finishes the process and returns what cancel does."""
 
-            # Only process "/cancel" from the same user
-            if (
-                new_update.message.text == "/cancel"
-                and new_update.message.from_user.id == user_id
-            ):
-                # Stop processing messages
-                stop_event.set()
+    @functools.wraps(handler)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        with cancellation_registry.register(
+            update.effective_chat.id, update.effective_user.id
+        ) as cancel_event:
+            result = await handler(update, context, cancel_event)
 
-                # Wait for any currently sending messages to finish
-                await asyncio.sleep(0.5)
+            if cancel_event.is_set():
+                return await cancel(update, context)
 
-                # Clear any remaining messages in the queue
-                while not context.application.update_queue.empty():
-                    context.application.update_queue.get_nowait()
+        return result
 
-                await cancel(update, context)
-                return
+    return wrapper
 
-        except asyncio.CancelledError:
-            return
-        except Exception as e:
-            print(f"Error checking for cancel: {e}")
 
-        await asyncio.sleep(0.1)
+async def request_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Triggered by /cancel command before any other handler.
+    Sets the cancel events of the user's running operations, which then finish the process.
+    If there are none, lets the conversation fallback handle /cancel."""
+    if cancellation_registry.cancel(update.effective_chat.id, update.effective_user.id):
+        raise ApplicationHandlerStop
 
 
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -149,6 +184,10 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE):
 
     if isinstance(error, TimedOut):
         error_message = "⏳ The request took too long and timed out. Please try again."
+    elif isinstance(error, RetryAfter):
+        error_message = "⏳ Too many messages are being sent. Please try again later."
+    elif isinstance(error, ExtractionBusyError):
+        error_message = "⏳ The bot is busy right now. Please try again in a moment."
     else:
         error_message = "⚠️ An unexpected error occurred. Please try again."
 
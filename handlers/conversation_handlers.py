@@ -15,15 +15,19 @@ Also includes:
 - Automatic cancellation detection throughout the conversation flow.
 """
 
-import asyncio
+import asyncio, time
+
+from contextlib import aclosing
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.error import BadRequest
 from telegram.ext import ContextTypes
 
+from config import SEND_INFOS_PREFETCH
+
 from handlers.common_handlers import (
     cancel,
-    check_for_cancel,
+    cancellable,
     send_thumbnail_photo,
     validate_youtube_url,
 )
@@ -36,18 +40,26 @@ from utils.bot_data import (
     STATISTICAL_INFO_OPTIONS,
     VIDEO_INFO_OPTIONS,
 )
+from utils.extraction_engine import ExtractionBusyError, extraction_engine
 from utils.format_helpers import (
     format_infos,
     format_video_urls,
     parse_videos_selection,
     split_message,
 )
+from utils.playlist_videos import PlaylistVideos
+from utils.send_scheduler import BULK_PRIORITY
+from utils.videos_statistics import VideosStatistics
 from utils.yt_helpers import (
-    get_hidden_playlist_videos,
     get_playlist_infos,
-    get_video_infos,
+    iter_playlist_videos_urls,
+    iter_videos_availability,
+    iter_videos_infos,
 )
 
+# Minimum seconds between edits of a progress message
+PROGRESS_UPDATE_INTERVAL = 3
+
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Triggered by /start command, start conversation with user (get URL and fetch details)."""
@@ -78,7 +90,10 @@ async def get_url(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 pass
 
     # Validate url, if there is an error, send error message, store message IDs and return
-    if error_message_text := await validate_youtube_url(url, context):
+    # A playlist is checked while its videos are listed, in handle_playlist
+    if error_message_text := await validate_youtube_url(
+        url, context, lazy_playlist=True
+    ):
         error_message = await context.bot.send_message(
             chat_id=update.effective_chat.id,
             text=f"{error_message_text}. Please send a valid video or playlist URL.",
@@ -99,12 +114,17 @@ async def get_url(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return await send_info_options_menu(update, context)
 
 
-async def handle_playlist(update: Update, context: ContextTypes.DEFAULT_TYPE):
+@cancellable
+async def handle_playlist(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, cancel_event: asyncio.Event
+):
     """Handles playlist processing by fetching videos and asking user to select."""
-    cancel_event = asyncio.Event()
-    check_cancel_task = asyncio.create_task(
-        check_for_cancel(update, context, cancel_event)
-    )
+    if extraction_engine.is_busy:
+        await context.bot.send_message(
+            chat_id=update.effective_chat.id,
+            text="⏳ The bot is busy right now. Please send the URL again in a moment.",
+        )
+        return PROVIDE_URL
 
     videos_processing_message = await context.bot.send_message(
         chat_id=update.effective_chat.id,
@@ -114,19 +134,74 @@ async def handle_playlist(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if cancel_event.is_set():
         return
 
-    if hidden_videos_urls := await get_hidden_playlist_videos(
-        context.user_data["videos_urls"], cancel_event
-    ):
-        context.user_data["playlist_hidden_videos"] = hidden_videos_urls
+    # Videos are checked page by page, while the next pages are listed
+    playlist_videos = context.user_data["playlist_videos"] = PlaylistVideos()
+    checked_videos_count = 0
+    last_progress_time = time.monotonic()
+
+    try:
+        async with aclosing(
+            iter_playlist_videos_urls(context.user_data["url_id"])
+        ) as pages:
+            async for page in pages:
+                # A video can be in a playlist more than once
+                page_indices = playlist_videos.extend(page)
+                hidden_videos_urls = set()
+
+                async for video_url, is_available in iter_videos_availability(
+                    page_indices.keys(), cancel_event
+                ):
+                    checked_videos_count += 1
+                    if not is_available:
+                        hidden_videos_urls.add(video_url)
+
+                    # Show progress, without hitting Telegram's message editing limits
+                    if (
+                        time.monotonic() - last_progress_time
+                        >= PROGRESS_UPDATE_INTERVAL
+                    ):
+                        last_progress_time = time.monotonic()
+                        try:
+                            await context.bot.edit_message_text(
+                                chat_id=update.effective_chat.id,
+                                message_id=videos_processing_message.message_id,
+                                text=f"🔍 Checking the playlist videos... {checked_videos_count}/{len(playlist_videos)} listed so far",
+                            )
+                        except BadRequest:
+                            pass
+
+                if cancel_event.is_set():
+                    return
 
-        # Keep only avaliable videos in videos_urls
-        context.user_data["videos_urls"] = [
-            url
-            for url in context.user_data["videos_urls"]
-            if url not in hidden_videos_urls
-        ]
+                for video_url in hidden_videos_urls:
+                    for index in page_indices[video_url]:
+                        playlist_videos.set_unavailable(index)
+    except ExtractionBusyError:
+        await context.bot.edit_message_text(
+            chat_id=update.effective_chat.id,
+            message_id=videos_processing_message.message_id,
+            text="⏳ The bot is busy right now. Please send the URL again in a moment.",
+        )
+        return PROVIDE_URL
 
-    context.user_data["playlist_available_videos"] = context.user_data["videos_urls"]
+    if not playlist_videos:
+        await context.bot.edit_message_text(
+            chat_id=update.effective_chat.id,
+            message_id=videos_processing_message.message_id,
+            text="❌ Unavailable YouTube URL. Please send a valid video or playlist URL.",
+        )
+
+        # Deleted when the next URL is received, as get_url does for its error messages
+        context.user_data["last_error_message_id"] = (
+            videos_processing_message.message_id
+        )
+        context.user_data["last_invalid_user_message_id"] = update.message.message_id
+        return PROVIDE_URL
+
+    # Views on playlist_videos, the URLs are only built when read
+    context.user_data["playlist_hidden_videos"] = playlist_videos.unavailable()
+    context.user_data["playlist_available_videos"] = playlist_videos.available()
+    context.user_data["videos_urls"] = context.user_data["playlist_available_videos"]
 
     if cancel_event.is_set():
         return
@@ -136,6 +211,7 @@ async def handle_playlist(update: Update, context: ContextTypes.DEFAULT_TYPE):
         message_id=videos_processing_message.message_id,
         text=f"This playlist has {len(context.user_data['playlist_available_videos'])} available videos.\n"
         "Choose which videos you want (e.g., 2, 4-7, 9).\n"
+        "Ranges can be open (e.g., -5, 10-), and ! excludes videos (e.g., !3).\n"
         "Or click 'None' or 'All'.",
         reply_markup=InlineKeyboardMarkup(
             [
@@ -147,8 +223,6 @@ async def handle_playlist(update: Update, context: ContextTypes.DEFAULT_TYPE):
         ),
     )
 
-    check_cancel_task.cancel()
-
     context.user_data["video_selection_message"] = videos_processing_message.message_id
 
     return SELECT_VIDEOS
@@ -186,7 +260,7 @@ async def get_selected_playlist_videos(
         user_input = update.message.text.replace(" ", "")
 
         if not (
-            selected_indices := parse_videos_selection(
+            selected_videos := parse_videos_selection(
                 user_input, len(context.user_data["playlist_available_videos"])
             )
         ):
@@ -202,10 +276,9 @@ async def get_selected_playlist_videos(
 
             return SELECT_VIDEOS
 
-        context.user_data["videos_urls"] = [
-            context.user_data["playlist_available_videos"][i - 1]
-            for i in selected_indices
-        ]
+        context.user_data["videos_urls"] = context.user_data[
+            "playlist_available_videos"
+        ].select(selected_videos.ranges())
 
     # Delete previous wrong and error messages (if exists) from user_data
     context.user_data.pop("last_error_message_id", None)
@@ -345,6 +418,7 @@ async def get_selected_info_options(update: Update, context: ContextTypes.DEFAUL
         await query.message.edit_text(
             text=f"This playlist has {len(context.user_data['playlist_available_videos'])} available videos.\n"
             "Choose which videos you want (e.g., 2, 4-7, 9).\n"
+            "Ranges can be open (e.g., -5, 10-), and ! excludes videos (e.g., !3).\n"
             "Or click 'None' or 'All'.",
             reply_markup=InlineKeyboardMarkup(
                 [
@@ -393,12 +467,11 @@ async def get_selected_info_options(update: Update, context: ContextTypes.DEFAUL
     return SELECT_INFO_OPTIONS
 
 
-async def send_infos(update: Update, context: ContextTypes.DEFAULT_TYPE):
+@cancellable
+async def send_infos(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, cancel_event: asyncio.Event
+):
     """Send the user the requested information."""
-    cancel_event = asyncio.Event()
-    check_cancel_task = asyncio.create_task(
-        check_for_cancel(update, context, cancel_event)
-    )
 
     async def send_message_checking_cancel(message: str) -> bool:
         """Send text message while checking for cancel command."""
@@ -411,16 +484,21 @@ async def send_infos(update: Update, context: ContextTypes.DEFAULT_TYPE):
             parse_mode="MarkdownV2",
             disable_web_page_preview=True,
             disable_notification=True,
+            rate_limit_args=BULK_PRIORITY,
         )
 
         return True
 
-    async def send_thumbnail_checking_cancel(thumbnail_url: str, caption: str) -> bool:
+    async def send_thumbnail_checking_cancel(
+        thumbnail_url: str, caption: str, thumbnails: list[dict] | None
+    ) -> bool:
         """Send thumbnail while checking for cancel command."""
         if cancel_event.is_set():
             return False
 
-        return await send_thumbnail_photo(update, context, thumbnail_url, caption)
+        return await send_thumbnail_photo(
+            update, context, thumbnail_url, caption, BULK_PRIORITY, thumbnails
+        )
 
     if any(
         "playlist" in option for option in context.user_data["selected_info_options"]
@@ -440,73 +518,65 @@ async def send_infos(update: Update, context: ContextTypes.DEFAULT_TYPE):
             if not await send_message_checking_cancel(chunk):
                 return
 
-    total_statistics_infos = None
+    videos_statistics = None
 
-    if (video_count := len(context.user_data["videos_urls"])) > 1:
+    if len(context.user_data["videos_urls"]) > 1:
         selected_statistical_info_options = [
             option
             for option in STATISTICAL_INFO_OPTIONS
             if option in context.user_data["selected_info_options"]
         ]
         if selected_statistical_info_options:
-            total_statistics_infos = {
-                option: 0 for option in selected_statistical_info_options
-            }
+            videos_statistics = VideosStatistics(selected_statistical_info_options)
 
     if any(
         option in VIDEO_INFO_OPTIONS
         for option in context.user_data["selected_info_options"]
     ):
-        for video_url in context.user_data["videos_urls"]:
-            if cancel_event.is_set():
-                return
-
-            video_infos = await get_video_infos(video_url)
-
-            if video_count > 1 and selected_statistical_info_options:
-                for option in selected_statistical_info_options:
-                    if isinstance(video_infos.get(option), (int, float)):
-                        total_statistics_infos[option] += video_infos[option]
-
-            message = format_infos(
-                video_infos, context.user_data["selected_info_options"]
+        async with aclosing(
+            iter_videos_infos(
+                context.user_data["videos_urls"], SEND_INFOS_PREFETCH, cancel_event
             )
-
-            if "thumbnail" in context.user_data[
-                "selected_info_options"
-            ] and video_infos.get("thumbnail"):
-                if await send_thumbnail_checking_cancel(
-                    video_infos["thumbnail"], message
-                ):
-                    continue
-
-            # If thumbnail wasn't sent with caption, or if it won't be sent, send the text message
-            for chunk in split_message(message):
-                if not await send_message_checking_cancel(chunk):
+        ) as videos_infos:
+            async for video_infos in videos_infos:
+                if cancel_event.is_set():
                     return
 
-    if total_statistics_infos and any(
-        info_value > 0 for info_value in total_statistics_infos.values()
-    ):
-        await send_message_checking_cancel(
-            "*Total Statistics:*\n\n"
-            + format_infos(total_statistics_infos, selected_statistical_info_options)
-        )
+                if videos_statistics is not None:
+                    videos_statistics.add(video_infos)
 
-        average_statistics_infos = {
-            info: int(info_value) if info_value.is_integer() else round(info_value, 2)
-            for info, info_value in (
-                (total_info, total_statistics_infos[total_info] / video_count)
-                for total_info in total_statistics_infos
-            )
-        }
+                video_infos = video_infos or {}
 
-        await send_message_checking_cancel(
-            "*Average Statistics:*\n\n"
-            + format_infos(average_statistics_infos, selected_statistical_info_options)
+                message = format_infos(
+                    video_infos, context.user_data["selected_info_options"]
+                )
+
+                if "thumbnail" in context.user_data[
+                    "selected_info_options"
+                ] and video_infos.get("thumbnail"):
+                    if await send_thumbnail_checking_cancel(
+                        video_infos["thumbnail"],
+                        message,
+                        video_infos.get("thumbnails"),
+                    ):
+                        continue
+
+                # If thumbnail wasn't sent with caption, or if it won't be sent, send the text message
+                for chunk in split_message(message):
+                    if not await send_message_checking_cancel(chunk):
+                        return
+
+    if videos_statistics is not None and (
+        statistics_report := videos_statistics.report(context.user_data["videos_urls"])
+    ):
+        message = "\n\n".join(
+            f"*{section} Statistics:*\n\n" + format_infos(infos, list(infos))
+            for section, infos in statistics_report.items()
         )
 
-    check_cancel_task.cancel()
+        for chunk in split_message(message):
+            if not await send_message_checking_cancel(chunk):
+                return
 
     context.user_data["selected_info_options"] = set()
     return await send_info_options_menu(update, context)
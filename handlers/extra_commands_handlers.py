@@ -14,7 +14,7 @@ from telegram import Update
 from telegram.ext import ContextTypes
 
 from handlers.common_handlers import (
-    check_for_cancel,
+    cancellable,
     send_thumbnail_photo,
     validate_youtube_url,
 )
@@ -28,14 +28,13 @@ from utils.yt_helpers import (
 )
 
 
-async def get_send_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+@cancellable
+async def get_send_info(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, cancel_event: asyncio.Event
+) -> None:
     """Triggered by /info command, send information on the video or playlist to user."""
     context.user_data.clear()
     context.user_data["conversation"] = False
-    cancel_event = asyncio.Event()
-    check_cancel_task = asyncio.create_task(
-        check_for_cancel(update, context, cancel_event)
-    )
 
     if not context.args:
         await context.bot.send_message(
@@ -48,7 +47,8 @@ async def get_send_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     url = context.args[0]
 
     # Validate url, if there is an error, send error message and return
-    if error_message_text := await validate_youtube_url(url, context):
+    # A video is checked by fetching its infos below
+    if error_message_text := await validate_youtube_url(url, context, lazy_video=True):
         await context.bot.send_message(
             chat_id=update.effective_chat.id,
             text=f"{error_message_text}. Please send a valid video or playlist URL.",
@@ -78,6 +78,14 @@ async def get_send_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     if cancel_event.is_set():
         return
 
+    if infos is None and context.user_data["url_type"] == "video":
+        await context.bot.edit_message_text(
+            chat_id=update.effective_chat.id,
+            message_id=processing_message.message_id,
+            text="❌ Unavailable YouTube URL. Please send a valid video or playlist URL.",
+        )
+        return
+
     infos_message = format_infos(infos, info_options)
 
     await context.bot.delete_message(
@@ -90,7 +98,11 @@ async def get_send_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 
     if infos.get("thumbnail"):
         if await send_thumbnail_photo(
-            update, context, infos["thumbnail"], infos_message
+            update,
+            context,
+            infos["thumbnail"],
+            infos_message,
+            thumbnails=infos.get("thumbnails"),
         ):
             return
 
@@ -102,8 +114,6 @@ async def get_send_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         disable_notification=True,
     )
 
-    check_cancel_task.cancel()
-
 
 async def get_send_thumbnail(
     update: Update, context: ContextTypes.DEFAULT_TYPE
@@ -122,7 +132,10 @@ async def get_send_thumbnail(
     url = context.args[0]
 
     # Validate url, if there is an error, send error message and return
-    if error_message_text := await validate_youtube_url(url, context):
+    # A video is checked by fetching its infos below, a playlist is refused
+    if error_message_text := await validate_youtube_url(
+        url, context, lazy_video=True, lazy_playlist=True
+    ):
         await context.bot.send_message(
             chat_id=update.effective_chat.id,
             text=f"{error_message_text}. Please send a valid video URL.",
@@ -136,7 +149,12 @@ async def get_send_thumbnail(
         )
         return
 
-    infos = await get_video_infos(context.user_data["videos_urls"][0])
+    if not (infos := await get_video_infos(context.user_data["videos_urls"][0])):
+        await context.bot.send_message(
+            chat_id=update.effective_chat.id,
+            text="❌ Unavailable YouTube URL. Please send a valid video URL.",
+        )
+        return
 
     if not infos.get("thumbnail"):
         await context.bot.send_message(
@@ -148,7 +166,11 @@ async def get_send_thumbnail(
     thumbnail_message = format_infos(infos, ["thumbnail"])
 
     if await send_thumbnail_photo(
-        update, context, infos["thumbnail"], thumbnail_message
+        update,
+        context,
+        infos["thumbnail"],
+        thumbnail_message,
+        thumbnails=infos.get("thumbnails"),
     ):
         return
 
@@ -47,7 +47,7 @@ async def help_url(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"📜 *Playlists:* Only URLs like `{escape_markdown_v2('youtube.​com/playlist?list=<playlist_ID>')}`{escape_markdown_v2('.')}\n\n"
         "⚠️ *Note:* Videos that are part of playlists \n"
         f"_{escape_markdown_v2('(e.g.')} `{escape_markdown_v2('youtube.​com/watch?v=<video_ID>&list=<playlist_ID>')}`{escape_markdown_v2(')')}_ {escape_markdown_v2('are treated as single videos.')}\n"
-        f"🎯 {escape_markdown_v2('You can select specific videos from a playlist!')}"
+        f"🎯 {escape_markdown_v2('You can select specific videos from a playlist (e.g. 2, 4-7, -5, 10-, !3)!')}"
     )
 
     await context.bot.send_message(
@@ -62,7 +62,7 @@ async def help_infos(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"• *{item.title()}*"
         for item in PLAYLIST_INFO_OPTIONS + ["playlist hidden videos"]
     )
-    statistical_infos_text = f"• *Total & Average:* _{', '.join(item.title() for item in STATISTICAL_INFO_OPTIONS)}_"
+    statistical_infos_text = f"• *Total, Average, Median, Percentiles, Min & Max:* _{', '.join(item.title() for item in STATISTICAL_INFO_OPTIONS)}_"
 
     text = (
         "ℹ️ *Available Information:*\n\n"
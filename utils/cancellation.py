@@ -0,0 +1,73 @@
+"""
+Provides a registry of cancel events for long-running operations, keyed by chat and user.
+
+Includes:
+- Registration of an event for each running operation of a user in a chat.
+- Cancellation of all operations of a user in a chat, as requested by /cancel.
+- Cancel latency statistics (time from the request until the operation stopped).
+"""
+
+import asyncio, time
+
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# Number of recent cancel latencies kept for statistics
+LATENCY_HISTORY_SIZE = 100
+
+
+class CancellationRegistry:
+    """Keeps the cancel events of the running operations of each (chat, user)."""
+
+    def __init__(self):
+        self._events = defaultdict(set)
+        self._cancel_times = {}
+        self.latencies = deque(maxlen=LATENCY_HISTORY_SIZE)
+
+    @contextmanager
+    def register(self, chat_id: int, user_id: int):
+        """Yields an event that is set when the user cancels, while the operation runs."""
+        key = (chat_id, user_id)
+        event = asyncio.Event()
+        self._events[key].add(event)
+
+        try:
+            yield event
+        finally:
+            self._events[key].discard(event)
+            if not self._events[key]:
+                del self._events[key]
+
+            if (cancel_time := self._cancel_times.pop(event, None)) is not None:
+                self.latencies.append(time.perf_counter() - cancel_time)
+
+    def is_running(self, chat_id: int, user_id: int) -> bool:
+        """Returns True if the user has a running operation in the chat."""
+        return bool(self._events.get((chat_id, user_id)))
+
+    def cancel(self, chat_id: int, user_id: int) -> bool:
+        """Sets the events of all running operations of the user in the chat.
+        Returns False if there were none."""
+        if not (events := self._events.get((chat_id, user_id))):
+            return False
+
+        for event in events:
+            if not event.is_set():
+                self._cancel_times[event] = time.perf_counter()
+                event.set()
+
+        return True
+
+    def stats(self) -> dict[str, int | float]:
+        """Returns the running operations count and recent cancel latencies, in seconds."""
+        return {
+            "running operations": sum(len(events) for events in self._events.values()),
+            "cancels": len(self.latencies),
+            "average latency": (
+                sum(self.latencies) / len(self.latencies) if self.latencies else 0
+            ),
+            "max latency": max(self.latencies, default=0),
+        }
+
+
+cancellation_registry = CancellationRegistry()
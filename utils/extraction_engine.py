@@ -0,0 +1,232 @@
+"""
+Provides a dedicated, bounded executor for yt_dlp extractions.
+
+Includes:
+- A thread pool or a process pool of pre-warmed workers, chosen by configuration.
+- A limit on queued and running extractions, failing fast when it is reached.
+- Automatic replacement of the process pool when a worker process crashes.
+- The blocking extraction function executed by the workers.
+- Page by page enumeration of playlist entries, in threads.
+"""
+
+import asyncio, itertools, threading, yt_dlp
+
+from collections.abc import AsyncIterator, Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import EXTRACTION_MAX_PENDING, EXTRACTION_MODE, EXTRACTION_WORKERS
+
+from utils.ydl_pool import YDL_PROFILES, ydl_pool
+
+# Profiles whose yt_dlp instances are built for each use instead of pooled
+UNPOOLED_PROFILES = {"playlist"}
+
+
+class ExtractionBusyError(Exception):
+    """Raised when the extraction engine already has as many extractions as it can queue."""
+
+
+def extract_info(
+    profile: str, url: str, sanitize: bool = False, fields: tuple | None = None
+) -> dict:
+    """Extracts info from the URL with a pooled yt_dlp instance of the given profile.
+    Blocking, meant to be run by the engine workers.
+    If sanitize is True, the info is made picklable, to be sent back from a process.
+    If fields are given, only those are returned, so less data is sent back."""
+    with ydl_pool.checkout(profile) as ydl:
+        try:
+            info = ydl.extract_info(url, download=False)
+        except yt_dlp.utils.DownloadError as e:
+            if not sanitize:
+                raise
+            # The original exception carries a traceback, which can't be pickled
+            raise yt_dlp.utils.DownloadError(str(e)) from None
+
+        if fields is not None:
+            info = {field: info[field] for field in fields if field in info}
+
+        return ydl.sanitize_info(info) if sanitize else info
+
+
+def iter_playlist_entries(profile: str, url: str) -> Iterator[dict]:
+    """Yields the entries of the playlist URL, fetching their pages from YouTube as they're needed.
+    Blocking, meant to be iterated in a thread.
+    Uses its own yt_dlp instance, as a pooled one would be held between pages: enumerations waiting
+    for the pool in every worker would then deadlock the ones holding it."""
+    ydl = yt_dlp.YoutubeDL(YDL_PROFILES[profile])
+    try:
+        # Unprocessed, the entries are a generator instead of a list
+        info = ydl.extract_info(url, download=False, process=False)
+        while info.get("_type") in ("url", "url_transparent"):
+            info = ydl.extract_info(
+                info["url"], download=False, process=False, ie_key=info.get("ie_key")
+            )
+
+        yield from info.get("entries") or []
+    finally:
+        # Only its connections are closed, as close() would also rewrite the cookie file
+        if request_director := ydl.__dict__.get("_request_director"):
+            request_director.close()
+
+
+def _warm_up_worker() -> None:
+    """Builds one yt_dlp instance of each pooled profile, so the first extraction doesn't pay for it."""
+    for profile in YDL_PROFILES:
+        if profile in UNPOOLED_PROFILES:
+            continue
+
+        with ydl_pool.checkout(profile):
+            pass
+
+
+class ExtractionEngine:
+    """Runs extractions in its own executor, apart from the event loop's default one.
+    At most max_pending extractions can be queued or running at the same time.
+    In process mode, the bot process only sends jobs and receives their results."""
+
+    def __init__(self, mode: str, max_workers: int, max_pending: int):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown extraction mode: {mode}")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._executor: Executor | None = None
+        self._restarts = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of extractions queued or running."""
+        return self._pending
+
+    @property
+    def is_busy(self) -> bool:
+        """True if no more extractions can be accepted right now."""
+        return self._pending >= self.max_pending
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, initializer=_warm_up_worker
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="extraction"
+                )
+
+        return self._executor
+
+    async def start(self) -> None:
+        """Creates the executor and pre-warms its workers."""
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, _warm_up_worker)
+                for _ in range(self.max_workers)
+            )
+        )
+
+    async def shutdown(self) -> None:
+        """Stops the workers, cancelling the extractions that haven't started yet."""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, cancel_futures=True)
+
+    def _restart_executor(self, broken_executor: Executor) -> None:
+        """Replaces a process pool broken by a crashed worker, unless it was already replaced."""
+        if self._executor is not broken_executor:
+            return
+
+        print("Extraction worker crashed, restarting the workers")
+        self._restarts += 1
+        self._executor = None
+        broken_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def extract(
+        self, profile: str, url: str, fields: Iterable[str] | None = None
+    ) -> dict:
+        """Extracts info from the URL in the engine's executor, returning only the given fields if any.
+        Raises ExtractionBusyError right away if the pending limit is reached.
+        If a worker process crashes, the extraction is retried once on new workers."""
+        if self.is_busy:
+            raise ExtractionBusyError(
+                f"{self._pending} extractions pending (limit is {self.max_pending})"
+            )
+
+        fields = tuple(fields) if fields is not None else None
+
+        self._pending += 1
+        try:
+            for retry in range(2):
+                executor = self._get_executor()
+                try:
+                    return await asyncio.get_running_loop().run_in_executor(
+                        executor,
+                        extract_info,
+                        profile,
+                        url,
+                        self.mode == "process",
+                        fields,
+                    )
+                except BrokenProcessPool:
+                    self._restart_executor(executor)
+                    if retry:
+                        raise
+        finally:
+            self._pending -= 1
+
+    async def iter_entries(
+        self, profile: str, url: str, page_size: int
+    ) -> AsyncIterator[list[dict]]:
+        """Yields the entries of the playlist URL, page_size at a time, fetching the next page while the caller handles one.
+        Runs in threads even in process mode, as the enumeration can't be moved between processes.
+        Raises ExtractionBusyError right away if the pending limit is reached."""
+        if self.is_busy:
+            raise ExtractionBusyError(
+                f"{self._pending} extractions pending (limit is {self.max_pending})"
+            )
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor() if self.mode == "thread" else None
+        entries = iter_playlist_entries(profile, url)
+        # A generator can't be closed while another thread is iterating it
+        entries_lock = threading.Lock()
+
+        def get_next_page() -> list[dict]:
+            with entries_lock:
+                return list(itertools.islice(entries, page_size))
+
+        def close_entries() -> None:
+            with entries_lock:
+                entries.close()
+
+        self._pending += 1
+        next_page = loop.run_in_executor(executor, get_next_page)
+        try:
+            while page := await next_page:
+                next_page = loop.run_in_executor(executor, get_next_page)
+                yield page
+        finally:
+            self._pending -= 1
+            # Doesn't wait for the page being fetched, if any, before closing
+            loop.run_in_executor(executor, close_entries)
+
+    def stats(self) -> dict[str, int | str]:
+        """Returns the engine mode, worker count, pending extractions, pending limit and worker restarts."""
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "max pending": self.max_pending,
+            "restarts": self._restarts,
+        }
+
+
+extraction_engine = ExtractionEngine(
+    EXTRACTION_MODE, EXTRACTION_WORKERS, EXTRACTION_MAX_PENDING
+)
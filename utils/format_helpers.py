@@ -2,38 +2,117 @@
 Provides formatting and parsing helper functions for user input and YouTube data.
 
 Includes:
-- Parsing of user video selection input (e.g., "2, 4-7, 9")
+- Parsing of user video selection input (e.g., "2, 4-7, 9", "-5", "10-, !12") into intervals
 - Formatting of durations, dates, and video chapters
 - Escaping of text for Telegram MarkdownV2
 - Formatting of video/playlist information for displaying
-- Splitting of long messages while preserving formatting
+- Splitting of long messages while preserving MarkdownV2 formatting, in a single scan
 """
 
-import re
+import bisect, re
 
+from collections.abc import Iterator, Sequence
 from datetime import datetime
 
+# MarkdownV2 entity markers, and escapes of their characters (or of a backslash) to skip
+MARKDOWN_V2_ENTITY_MARKER_PATTERN = re.compile(r"\\[\\`*_~|]|```|`|\*|__|_|~|\|\|")
 
-def parse_videos_selection(selection: str, video_count: int) -> list[int] | None:
-    """Converts a user input selection string (e.g., "2, 4-7, 9") into a list of valid indices."""
-    indices = set()
-    try:
-        parts = selection.split(",")
-        for part in parts:
-            if "-" in part:
-                start, end = map(int, part.split("-"))
-                if start > end or start < 1 or end > video_count:
-                    return None
-                indices.update(range(start, end + 1))
+# Length of all MarkdownV2 entity markers, to close the open entities at the end of a chunk
+ENTITY_MARKERS_MAX_LENGTH = len("```" "`" "*" "__" "_" "~" "||")
+
+# A part of a video selection: an index or a range (open-ended or not), excluded if prefixed by "!"
+VIDEOS_SELECTION_PART_PATTERN = re.compile(
+    r"(?P<excluded>!)?(?:(?P<index>\d+)|(?P<start>\d*)-(?P<end>\d*))", re.ASCII
+)
+
+
+class VideosSelection:
+    """Selected video positions (1-based), as sorted and merged (start, end) intervals.
+    Counted in the number of intervals, and iterated lazily."""
+
+    def __init__(self, intervals: list[tuple[int, int]]):
+        self.intervals = intervals
+
+    def __len__(self) -> int:
+        return sum(end - start + 1 for start, end in self.intervals)
+
+    def __iter__(self) -> Iterator[int]:
+        for start, end in self.intervals:
+            yield from range(start, end + 1)
+
+    def ranges(self) -> Iterator[range]:
+        """Yields the intervals as ranges of 0-based positions."""
+        return (range(start - 1, end) for start, end in self.intervals)
+
+
+def merge_intervals(intervals: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Sorts (start, end) intervals, merging the overlapping and adjacent ones."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+
+    return merged
+
+
+def subtract_intervals(
+    intervals: list[tuple[int, int]], excluded_intervals: list[tuple[int, int]]
+) -> list[tuple[int, int]]:
+    """Removes excluded intervals from intervals, both being sorted and merged."""
+    result = []
+    excluded_intervals = iter(excluded_intervals)
+    excluded = next(excluded_intervals, None)
+
+    for start, end in intervals:
+        while excluded and start <= end:
+            excluded_start, excluded_end = excluded
+            if excluded_end < start:
+                excluded = next(excluded_intervals, None)
+            elif excluded_start > end:
+                break
             else:
-                index = int(part)
-                if index < 1 or index > video_count:
-                    return None
-                indices.add(index)
-    except ValueError:
-        return None
+                if excluded_start > start:
+                    result.append((start, excluded_start - 1))
+                start = excluded_end + 1
+                if excluded_end <= end:
+                    excluded = next(excluded_intervals, None)
+
+        if start <= end:
+            result.append((start, end))
 
-    return sorted(indices)
+    return result
+
+
+def parse_videos_selection(selection: str, video_count: int) -> VideosSelection | None:
+    """Converts a user input selection string (e.g., "2, 4-7, 9") into the selected videos.
+    Ranges can be open ("-5" for the first five, "5-" for the fifth to last), and "!" excludes
+    videos (e.g., "1-20, !7" or only "!7" for all videos but the seventh)."""
+    intervals = []
+    excluded_intervals = []
+
+    for part in selection.split(","):
+        match = VIDEOS_SELECTION_PART_PATTERN.fullmatch(part)
+        if not match or not any(match.group("index", "start", "end")):
+            return None
+
+        if match["index"]:
+            start = end = int(match["index"])
+        else:
+            start = int(match["start"] or 1)
+            end = int(match["end"] or video_count)
+
+        if start > end or start < 1 or end > video_count:
+            return None
+
+        (excluded_intervals if match["excluded"] else intervals).append((start, end))
+
+    intervals = merge_intervals(intervals) if intervals else [(1, video_count)]
+    if excluded_intervals:
+        intervals = subtract_intervals(intervals, merge_intervals(excluded_intervals))
+
+    return VideosSelection(intervals) if intervals else None
 
 
 def format_seconds(seconds: str) -> str:
@@ -57,7 +136,7 @@ def format_date(date: str) -> str:
         return date
 
 
-def format_video_urls(video_urls: list[str], max_videos_display: int = 10) -> str:
+def format_video_urls(video_urls: Sequence[str], max_videos_display: int = 10) -> str:
     """Formats a list of video URLs into a message."""
     formatted_video_urls = "\n".join(
         f"• {url}" for url in video_urls[:max_videos_display]
@@ -128,39 +207,109 @@ def format_infos(infos: dict[str, str], selected_info_options: list[str]) -> str
     )
 
 
-def split_message(message: str, chunk_size: int = 4096) -> list[str]:
-    """Splits a long message into smaller chunks, prioritizing newlines and preserving MarkdownV2 formatting."""
-    chunks = []
-
-    while message:
-        if len(message) <= chunk_size:
-            chunks.append(message)
-            break
+def is_escaped(message: str, position: int) -> bool:
+    """Returns True if the character at position is escaped by a backslash."""
+    backslashes_start = position
+    while backslashes_start > 0 and message[backslashes_start - 1] == "\\":
+        backslashes_start -= 1
 
-        # Try to split at the last newline within chunk_size
-        split_position = message.rfind("\n", 0, chunk_size)
+    return (position - backslashes_start) % 2 == 1
 
-        # If no newline found, find a space instead
-        if split_position == -1:
-            split_position = message.rfind(" ", 0, chunk_size)
 
-            # If no space found, force split at chunk_size
-            if split_position == -1:
-                split_position = chunk_size
+def split_message(message: str, chunk_size: int = 4096) -> list[str]:
+    """Splits a long message into chunks of up to chunk_size characters (e.g. 1024 for captions), keeping MarkdownV2 valid.
+    Splits at the last newline (or else space) outside any entity. Otherwise, closes the entities open at
+    the split and reopens them in the next chunk. Scans the message once."""
+    if len(message) <= chunk_size:
+        return [message] if message else []
+
+    # Positions where the open entities change, and the entities then open (their markers)
+    entities_positions, entities_states = [0], [()]
+    markers_insides = set()
+    entities = ()
+
+    for match in MARKDOWN_V2_ENTITY_MARKER_PATTERN.finditer(message):
+        marker, start, end = match[0], match.start(), match.end()
+        if marker[0] == "\\":
+            continue
+
+        markers_insides.update(range(start + 1, end))
+
+        # Inside code, only the closing marker counts
+        if entities and entities[-1] in ("`", "```") and marker != entities[-1]:
+            continue
+
+        if marker in entities:
+            entities = tuple(entity for entity in entities if entity != marker)
+        else:
+            entities += (marker,)
+
+        entities_positions.append(end)
+        entities_states.append(entities)
+
+    def get_entities(position: int) -> tuple[str, ...]:
+        return entities_states[bisect.bisect_right(entities_positions, position) - 1]
+
+    def find_last(separator: str, start: int, end: int, safe: bool) -> int | None:
+        """Returns the last unescaped separator position in (start, end], outside any entity if safe."""
+        position = message.rfind(separator, start + 1, end + 1)
+
+        while position != -1:
+            if is_escaped(message, position):
+                before = position
+            elif safe and get_entities(position):
+                # Skip to before the entities open there
+                before = entities_positions[
+                    bisect.bisect_right(entities_positions, position) - 1
+                ]
+            else:
+                return position
 
-        chunk = message[:split_position]
+            position = message.rfind(separator, start + 1, before)
 
-        # Ensure no split in the middle of a MarkdownV2 entity
-        open_bold = chunk.count("*") % 2 != 0
-        open_italic = chunk.count("_") % 2 != 0
-        open_bolditalic = chunk.count("***") % 2 != 0
+        return None
 
-        if open_bold or open_italic or open_bolditalic:
-            if safe_split := re.search(r"([*_]+)", chunk[::-1]):
-                split_position -= safe_split.start() + 1
-                chunk = message[:split_position]
+    chunks = []
+    start = 0
+    reopening = ""
 
-        chunks.append(chunk.strip())
-        message = message[split_position:].lstrip()
+    while True:
+        end = start + chunk_size - len(reopening)
+        if len(message) <= end:
+            chunks.append(reopening + message[start:])
+            break
 
-    return chunks
+        if (
+            split_position := find_last("\n", start, end, True)
+            or find_last(" ", start, end, True)
+        ) is not None:
+            chunks.append(reopening + message[start:split_position])
+            start, reopening = split_position + 1, ""
+            continue
+
+        # Split inside entities, keeping room to close them
+        end -= ENTITY_MARKERS_MAX_LENGTH
+        if (
+            split_position := find_last("\n", start, end, False)
+            or find_last(" ", start, end, False)
+        ) is not None:
+            next_start = split_position + 1
+        else:
+            split_position = max(end, start + 1)
+            while split_position - 1 > start and (
+                split_position in markers_insides or is_escaped(message, split_position)
+            ):
+                split_position -= 1
+            while split_position in markers_insides or is_escaped(
+                message, split_position
+            ):
+                split_position += 1
+            next_start = split_position
+
+        entities = get_entities(split_position)
+        chunks.append(
+            reopening + message[start:split_position] + "".join(reversed(entities))
+        )
+        start, reopening = next_start, "".join(entities)
+
+    return [chunk for chunk in chunks if chunk.strip()]
@@ -0,0 +1,100 @@
+"""
+Provides shared aiohttp sessions, one per group of hosts, for the whole application.
+
+Includes:
+- Connection pooling with per-host limits, keep-alive and DNS caching.
+- Creation on bot startup and closing on shutdown.
+- Request, connection reuse and DNS cache statistics for each session.
+"""
+
+import aiohttp
+
+from config import HTTP_DNS_CACHE_TTL, HTTP_KEEPALIVE_TIMEOUT, HTTP_LIMIT_PER_HOST
+
+# Groups of hosts sharing a session
+HOST_GROUPS = {
+    "googleapis": "YouTube Data API (www.googleapis.com)",
+    "ytimg": "YouTube thumbnails (i.ytimg.com)",
+}
+
+
+class HttpSessions:
+    """Keeps one long-lived ClientSession per host group."""
+
+    def __init__(
+        self, limit_per_host: int, keepalive_timeout: float, dns_cache_ttl: int
+    ):
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._sessions = {}
+        self._stats = {
+            group: {
+                "requests": 0,
+                "requests in progress": 0,
+                "connections created": 0,
+                "connections reused": 0,
+                "dns cache hits": 0,
+                "dns cache misses": 0,
+            }
+            for group in HOST_GROUPS
+        }
+
+    async def start(self) -> None:
+        """Creates the sessions of all host groups."""
+        for group in HOST_GROUPS:
+            self.get(group)
+
+    async def close(self) -> None:
+        """Closes all sessions and their connections."""
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            await session.close()
+
+    def get(self, group: str) -> aiohttp.ClientSession:
+        """Returns the session of a host group, creating it if needed."""
+        if (session := self._sessions.get(group)) is None or session.closed:
+            session = self._sessions[group] = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    use_dns_cache=True,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                ),
+                trace_configs=[self._build_trace_config(group)],
+            )
+
+        return session
+
+    def _build_trace_config(self, group: str) -> aiohttp.TraceConfig:
+        """Builds the tracing callbacks that update the group statistics."""
+        stats = self._stats[group]
+
+        def count(*names: str, increment: int = 1):
+            async def callback(session, trace_config_ctx, params):
+                for name in names:
+                    stats[name] += increment
+
+            return callback
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(count("requests", "requests in progress"))
+        trace_config.on_request_end.append(count("requests in progress", increment=-1))
+        trace_config.on_request_exception.append(
+            count("requests in progress", increment=-1)
+        )
+        trace_config.on_connection_create_end.append(count("connections created"))
+        trace_config.on_connection_reuseconn.append(count("connections reused"))
+        trace_config.on_dns_cache_hit.append(count("dns cache hits"))
+        trace_config.on_dns_cache_miss.append(count("dns cache misses"))
+
+        return trace_config
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Returns, for each host group, the request, connection and DNS cache counters."""
+        return {group: dict(stats) for group, stats in self._stats.items()}
+
+
+http_sessions = HttpSessions(
+    HTTP_LIMIT_PER_HOST, HTTP_KEEPALIVE_TIMEOUT, HTTP_DNS_CACHE_TTL
+)
@@ -2,37 +2,148 @@
 Provides helper functions for handling video thumbnails.
 
 Includes:
-- Asynchronous fetching of thumbnail images from a given URL.
-- Convertion of image bytes to JPEG format using Pillow.
+- Asynchronous fetching of thumbnail images, choosing the smallest variant meeting a target width.
+- Convertion of image bytes to JPEG format using Pillow, downscaled to a maximum size, in a thread.
+- Thumbnail processing time and size statistics.
+- Storage of the Telegram file IDs of sent thumbnails, so they're sent again without uploading.
 """
 
-import aiohttp
+import aiohttp, asyncio, time
 
+from collections import OrderedDict
 from io import BytesIO
 from PIL import Image
 
+from config import THUMBNAIL_MAX_SIZE, THUMBNAIL_TARGET_WIDTH
 
-async def fetch_video_thumbnail(thumbnail_url: str) -> bytes | None:
-    """Fetches the thumbnail of a video from the provided URL."""
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(thumbnail_url) as response:
+from utils.http_sessions import http_sessions
+from utils.metadata_store import metadata_store
+
+# Number of thumbnail URLs remembered as unavailable, so they aren't requested again
+MAX_UNAVAILABLE_THUMBNAILS = 10_000
+
+unavailable_thumbnails = OrderedDict()
+
+
+def select_thumbnail_urls(
+    thumbnail_url: str, thumbnails: list[dict] | None, target_width: int
+) -> list[str]:
+    """Returns the thumbnail URLs to try, in order:
+    variants at least target_width wide (smallest first), then narrower ones (widest first), then thumbnail_url.
+    URLs known to be unavailable are left out."""
+    thumbnails = thumbnails or []
+    urls = [
+        variant["url"] for variant in thumbnails if variant["width"] >= target_width
+    ]
+    urls += [
+        variant["url"]
+        for variant in reversed(thumbnails)
+        if variant["width"] < target_width
+    ]
+
+    if thumbnail_url not in urls:
+        urls.append(thumbnail_url)
+
+    return [url for url in urls if url not in unavailable_thumbnails]
+
+
+async def fetch_video_thumbnail(
+    thumbnail_url: str, thumbnails: list[dict] | None = None
+) -> bytes | None:
+    """Fetches the thumbnail of a video, using the smallest variant at least THUMBNAIL_TARGET_WIDTH wide.
+    If a variant doesn't exist, tries the next best one."""
+    for url in select_thumbnail_urls(thumbnail_url, thumbnails, THUMBNAIL_TARGET_WIDTH):
+        try:
+            async with http_sessions.get("ytimg").get(url) as response:
                 response.raise_for_status()
                 return await response.read()
-    except aiohttp.ClientError as e:
-        print(f"Error fetching thumbnail: {e}")
-        return None
+        except aiohttp.ClientResponseError as e:
+            if e.status != 404:
+                print(f"Error fetching thumbnail: {e}")
+                return None
+
+            unavailable_thumbnails[url] = True
+            if len(unavailable_thumbnails) > MAX_UNAVAILABLE_THUMBNAILS:
+                unavailable_thumbnails.popitem(last=False)
+        except aiohttp.ClientError as e:
+            print(f"Error fetching thumbnail: {e}")
+            return None
+
+    return None
 
 
-def convert_image_to_jpeg(image_data: bytes) -> BytesIO | None:
-    """Converts an image in bytes to JPEG format."""
+def convert_image_to_jpeg(image_data: bytes, max_size: int) -> bytes | None:
+    """Converts an image in bytes to JPEG format, downscaled to fit in max_size x max_size.
+    JPEG images that already fit are returned as they are, without re-encoding."""
     try:
         image = Image.open(BytesIO(image_data))
+
+        if image.format == "JPEG" and image.mode in ("RGB", "L"):
+            if max(image.size) <= max_size:
+                image.verify()
+                return image_data
+
+            # Let the decoder itself downscale, by the largest power of 2 keeping at least max_size
+            image.draft("RGB", (max_size, max_size))
+
         image = image.convert("RGB")
+        image.thumbnail((max_size, max_size))
         new_image = BytesIO()
         image.save(new_image, format="JPEG")
-        new_image.seek(0)
-        return new_image
+        return new_image.getvalue()
     except Exception as e:
         print(f"Error processing image: {e}")
         return None
+
+
+class ThumbnailProcessor:
+    """Converts thumbnails in a thread, off the event loop, keeping processing statistics."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._processed = 0
+        self._skipped = 0
+        self._total_time = 0.0
+        self._bytes_saved = 0
+
+    async def process(self, image_data: bytes) -> bytes | None:
+        """Returns the thumbnail as JPEG bytes fitting the maximum size, or None if it can't be processed."""
+        start_time = time.perf_counter()
+        processed_image = await asyncio.to_thread(
+            convert_image_to_jpeg, image_data, self.max_size
+        )
+
+        if processed_image is not None:
+            self._processed += 1
+            self._skipped += processed_image is image_data
+            self._total_time += time.perf_counter() - start_time
+            self._bytes_saved += len(image_data) - len(processed_image)
+
+        return processed_image
+
+    def stats(self) -> dict[str, int | float]:
+        """Returns processed thumbnails, those sent as they were, average time in seconds and bytes saved."""
+        return {
+            "processed": self._processed,
+            "not re-encoded": self._skipped,
+            "average time": (
+                self._total_time / self._processed if self._processed else 0
+            ),
+            "bytes saved": self._bytes_saved,
+        }
+
+
+thumbnail_processor = ThumbnailProcessor(THUMBNAIL_MAX_SIZE)
+
+
+async def get_thumbnail_file_id(thumbnail_url: str) -> str | None:
+    """Returns the Telegram file ID of the thumbnail, if it was already sent."""
+    if stored := await metadata_store.get("thumbnails", thumbnail_url):
+        return stored[0]["file id"]
+
+    return None
+
+
+def store_thumbnail_file_id(thumbnail_url: str, file_id: str | None) -> None:
+    """Stores the Telegram file ID of a sent thumbnail (None to forget it)."""
+    metadata_store.put("thumbnails", thumbnail_url, {"file id": file_id})
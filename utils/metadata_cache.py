@@ -0,0 +1,158 @@
+"""
+Provides a bounded in-memory cache of video metadata, keyed by video ID.
+
+Includes:
+- LRU eviction, limited by number of entries and estimated memory usage.
+- Separate expiration for static fields (title, description...) and counters (views, likes, comments).
+- Hit, miss and eviction counters.
+"""
+
+import sys, threading, time
+
+from collections import OrderedDict
+
+from config import (
+    VIDEO_CACHE_COUNTERS_TTL,
+    VIDEO_CACHE_MAX_BYTES,
+    VIDEO_CACHE_MAX_ENTRIES,
+    VIDEO_CACHE_STATIC_TTL,
+)
+
+# Video infos that change often, so they expire sooner than the others
+VIDEO_COUNTERS_INFOS = ["views count", "likes count", "comments count"]
+
+
+def estimate_size(value) -> int:
+    """Roughly estimates the memory used by a value and everything it contains, in bytes."""
+    size = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+
+    return size
+
+
+class VideoInfosCache:
+    """Least recently used video infos, with static fields and counters stored and expired separately."""
+
+    def __init__(
+        self, max_entries: int, max_bytes: int, static_ttl: float, counters_ttl: float
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.static_ttl = static_ttl
+        self.counters_ttl = counters_ttl
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = self.partial_hits = self.misses = self.evictions = 0
+
+    def get(self, video_id: str) -> tuple[dict | None, bool]:
+        """Returns (video infos, are counters fresh).
+        Infos are None if the video isn't cached or its static fields expired."""
+        now = time.monotonic()
+
+        with self._lock:
+            if not (entry := self._entries.get(video_id)):
+                self.misses += 1
+                return None, False
+
+            if now - entry["static time"] > self.static_ttl:
+                self._remove(video_id)
+                self.misses += 1
+                return None, False
+
+            self._entries.move_to_end(video_id)
+
+            if are_counters_fresh := now - entry["counters time"] <= self.counters_ttl:
+                self.hits += 1
+            else:
+                self.partial_hits += 1
+
+            return {**entry["static"], **entry["counters"]}, are_counters_fresh
+
+    def put(
+        self,
+        video_id: str,
+        infos: dict,
+        age: float = 0,
+        counters_age: float | None = None,
+    ) -> None:
+        """Stores all infos of a video, fetched age seconds ago (counters_age for its counters, if different).
+        Evicts the least recently used videos if needed."""
+        now = time.monotonic()
+        entry = {
+            "static": {
+                info: value
+                for info, value in infos.items()
+                if info not in VIDEO_COUNTERS_INFOS
+            },
+            "counters": {
+                info: value
+                for info, value in infos.items()
+                if info in VIDEO_COUNTERS_INFOS
+            },
+            "static time": now - age,
+            "counters time": now - (age if counters_age is None else counters_age),
+        }
+        entry["size"] = estimate_size(entry["static"]) + estimate_size(
+            entry["counters"]
+        )
+
+        # Don't let a single huge entry flush the whole cache
+        if entry["size"] > self.max_bytes:
+            return
+
+        with self._lock:
+            if video_id in self._entries:
+                self._remove(video_id)
+
+            self._entries[video_id] = entry
+            self._size += entry["size"]
+            self._evict()
+
+    def update_counters(self, video_id: str, counters: dict) -> None:
+        """Replaces the counters of a cached video, renewing their expiration."""
+        with self._lock:
+            if not (entry := self._entries.get(video_id)):
+                return
+
+            self._size -= entry["size"]
+            entry["counters"] = counters
+            entry["counters time"] = time.monotonic()
+            entry["size"] = estimate_size(entry["static"]) + estimate_size(counters)
+            self._size += entry["size"]
+            self._evict()
+
+    def _remove(self, video_id: str) -> None:
+        self._size -= self._entries.pop(video_id)["size"]
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._size > self.max_bytes
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._size -= entry["size"]
+            self.evictions += 1
+
+    def stats(self) -> dict[str, int]:
+        """Returns the cache counters, number of entries and estimated size in bytes."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "hits": self.hits,
+                "partial hits": self.partial_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+video_infos_cache = VideoInfosCache(
+    VIDEO_CACHE_MAX_ENTRIES,
+    VIDEO_CACHE_MAX_BYTES,
+    VIDEO_CACHE_STATIC_TTL,
+    VIDEO_CACHE_COUNTERS_TTL,
+)
@@ -0,0 +1,315 @@
+"""
+Provides a persistent store of video, playlist and channel metadata, backed by a local SQLite file.
+Also stores the Telegram file IDs of sent thumbnails, and the ETags of listed playlist pages.
+
+Includes:
+- One table per kind of metadata, with a column per info and the time it was fetched.
+- Video counters (views, likes, comments) refreshed on their own, with the time of their last refresh.
+- Expiration of rows older than a configured TTL.
+- Batched writes and reads, run in a dedicated thread so they never block the event loop.
+- Periodic compaction, which removes expired and excess rows and incrementally vacuums the file.
+"""
+
+import asyncio, json, sqlite3, time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    METADATA_STORE_COMPACT_INTERVAL,
+    METADATA_STORE_FLUSH_INTERVAL,
+    METADATA_STORE_MAX_ROWS,
+    METADATA_STORE_PATH,
+    METADATA_STORE_TTL,
+)
+
+# Columns of each table, mapped to the info they store
+TABLES = {
+    "videos": {
+        "title": "title",
+        "duration": "duration",
+        "views_count": "views count",
+        "likes_count": "likes count",
+        "comments_count": "comments count",
+        "upload_date": "upload date",
+        "uploader": "uploader",
+        "description": "description",
+        "chapters": "chapters",
+        "thumbnail": "thumbnail",
+        "thumbnails": "thumbnails",
+    },
+    "playlists": {
+        "title": "playlist title",
+        "description": "playlist description",
+        "uploader": "playlist uploader",
+    },
+    "channels": {
+        "channel": "channel",
+    },
+    "thumbnails": {
+        "file_id": "file id",
+    },
+    "playlist_pages": {
+        "etag": "etag",
+        "videos_ids": "videos ids",
+        "next_page_token": "next page token",
+    },
+}
+
+# Columns holding lists or dictionaries, stored as JSON
+JSON_COLUMNS = {"chapters", "thumbnails", "videos_ids"}
+
+# Columns of the videos table refreshed apart from the others, at the time in counters_fetched_at
+VIDEO_COUNTERS_COLUMNS = ["views_count", "likes_count", "comments_count"]
+
+
+class MetadataStore:
+    """Stores metadata rows by kind ("videos", "playlists", "channels", "thumbnails" or "playlist_pages") and ID.
+    Writes are kept in memory and flushed together every flush_interval seconds."""
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float,
+        max_rows: int,
+        flush_interval: float,
+        compact_interval: float,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self._connection = None
+        self._executor = None
+        self._pending_writes = {table: {} for table in TABLES}
+        self._pending_counters = {}
+        self._tasks = []
+
+    async def start(self) -> None:
+        """Opens the database, creating missing tables and columns, and starts the flush and compaction loops."""
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="metadata_store"
+        )
+        await self._run(self._open)
+
+        self._tasks = [
+            asyncio.create_task(self._repeat(self.flush, self.flush_interval)),
+            asyncio.create_task(self._repeat(self.compact, self.compact_interval)),
+        ]
+
+    async def close(self) -> None:
+        """Flushes pending writes and closes the database."""
+        if self._executor is None:
+            return
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        await self.flush()
+        await self._run(self._connection.close)
+
+        self._executor.shutdown()
+        self._executor = None
+
+    async def _run(self, function, *args):
+        """Runs a function in the database thread."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, function, *args
+        )
+
+    async def _repeat(self, function, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await function()
+            except sqlite3.Error as e:
+                print(f"Error in metadata store {function.__name__}: {e}")
+
+    def _open(self) -> None:
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        # Only applies to a new file, or to an existing one once it's vacuumed
+        self._connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._connection.execute("PRAGMA journal_mode=WAL")
+
+        for table, columns in TABLES.items():
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (id TEXT PRIMARY KEY, fetched_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_fetched_at ON {table} (fetched_at)"
+            )
+
+            existing_columns = {
+                row[1]
+                for row in self._connection.execute(f"PRAGMA table_info({table})")
+            }
+            for column in columns:
+                if column not in existing_columns:
+                    self._connection.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+
+            # Null until the counters are refreshed, being fetched with the row
+            if table == "videos" and "counters_fetched_at" not in existing_columns:
+                self._connection.execute(
+                    "ALTER TABLE videos ADD COLUMN counters_fetched_at REAL"
+                )
+
+        self._connection.commit()
+
+    async def get(self, table: str, id: str) -> tuple[dict, float] | None:
+        """Returns (infos, age in seconds) of a stored row, or None if it's missing or expired."""
+        if self._executor is None:
+            return None
+
+        if id in self._pending_writes[table]:
+            infos, fetched_at = self._pending_writes[table][id]
+            return dict(infos), time.time() - fetched_at
+
+        if not (stored := await self._run(self._select, table, id)):
+            return None
+
+        infos, fetched_at, _ = stored
+        return infos, time.time() - fetched_at
+
+    async def get_video(self, video_id: str) -> tuple[dict, float, float] | None:
+        """Returns (infos, age, counters age) of a stored video, or None if it's missing or expired.
+        Its counters are refreshed on their own, so have an age of their own."""
+        if self._executor is None:
+            return None
+
+        if video_id in self._pending_writes["videos"]:
+            infos, fetched_at = self._pending_writes["videos"][video_id]
+            infos, counters_fetched_at = dict(infos), fetched_at
+        elif stored := await self._run(self._select, "videos", video_id):
+            infos, fetched_at, counters_fetched_at = stored
+        else:
+            return None
+
+        if video_id in self._pending_counters:
+            counters, counters_fetched_at = self._pending_counters[video_id]
+            infos.update(counters)
+
+        now = time.time()
+        return infos, now - fetched_at, now - counters_fetched_at
+
+    def _select(self, table: str, id: str) -> tuple[dict, float, float] | None:
+        """Returns (infos, fetched_at, counters_fetched_at), the latter being fetched_at
+        in tables without counters or if they were never refreshed."""
+        columns = TABLES[table]
+        counters_fetched_at = (
+            "COALESCE(counters_fetched_at, fetched_at)"
+            if table == "videos"
+            else "fetched_at"
+        )
+        row = self._connection.execute(
+            f"SELECT fetched_at, {counters_fetched_at}, {', '.join(columns)} FROM {table} "
+            "WHERE id = ? AND fetched_at >= ?",
+            (id, time.time() - self.ttl),
+        ).fetchone()
+
+        if not row:
+            return None
+
+        infos = {
+            info: json.loads(value) if column in JSON_COLUMNS and value else value
+            for (column, info), value in zip(columns.items(), row[2:])
+        }
+
+        return infos, row[0], row[1]
+
+    def put(self, table: str, id: str, infos: dict, age: float = 0) -> None:
+        """Queues a row to be written on the next flush. Doesn't block."""
+        if self._executor is None:
+            return
+
+        self._pending_writes[table][id] = (dict(infos), time.time() - age)
+        # The written row has newer counters than any queued refresh
+        if table == "videos":
+            self._pending_counters.pop(id, None)
+
+    def update_video_counters(self, video_id: str, counters: dict) -> None:
+        """Queues refreshed counters of a stored video, keeping the fetch time of its other infos.
+        Doesn't block."""
+        if self._executor is None:
+            return
+
+        self._pending_counters[video_id] = (dict(counters), time.time())
+
+    async def flush(self) -> None:
+        """Writes all queued rows, then all queued counters, in a single transaction."""
+        pending_writes, pending_counters = self._pending_writes, self._pending_counters
+        if not any(pending_writes.values()) and not pending_counters:
+            return
+
+        self._pending_writes = {table: {} for table in TABLES}
+        self._pending_counters = {}
+        await self._run(self._write, pending_writes, pending_counters)
+
+    def _write(self, pending_writes: dict[str, dict], pending_counters: dict) -> None:
+        with self._connection:
+            for table, rows in pending_writes.items():
+                if not rows:
+                    continue
+
+                columns = TABLES[table]
+                self._connection.executemany(
+                    f"INSERT OR REPLACE INTO {table} (id, fetched_at, {', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' * (len(columns) + 2))})",
+                    (
+                        (id, fetched_at, *self._to_values(table, infos))
+                        for id, (infos, fetched_at) in rows.items()
+                    ),
+                )
+
+            if pending_counters:
+                counters_infos = [TABLES["videos"][c] for c in VIDEO_COUNTERS_COLUMNS]
+                self._connection.executemany(
+                    f"UPDATE videos SET {', '.join(f'{c} = ?' for c in VIDEO_COUNTERS_COLUMNS)}, "
+                    "counters_fetched_at = ? WHERE id = ?",
+                    (
+                        (*map(counters.get, counters_infos), refreshed_at, id)
+                        for id, (counters, refreshed_at) in pending_counters.items()
+                    ),
+                )
+
+    @staticmethod
+    def _to_values(table: str, infos: dict) -> list:
+        """Returns the column values of a row, in the table columns order."""
+        return [
+            json.dumps(infos.get(info)) if column in JSON_COLUMNS else infos.get(info)
+            for column, info in TABLES[table].items()
+        ]
+
+    async def compact(self) -> None:
+        """Deletes expired rows and the oldest ones above max_rows per table, then frees their pages.
+        A file created without incremental auto-vacuum is fully vacuumed once to enable it.
+        """
+        await self._run(self._compact)
+
+    def _compact(self) -> None:
+        with self._connection:
+            for table in TABLES:
+                self._connection.execute(
+                    f"DELETE FROM {table} WHERE fetched_at < ?",
+                    (time.time() - self.ttl,),
+                )
+                self._connection.execute(
+                    f"DELETE FROM {table} WHERE id IN "
+                    f"(SELECT id FROM {table} ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_rows,),
+                )
+
+        if self._connection.execute("PRAGMA auto_vacuum").fetchone()[0]:
+            # executescript runs the pragma to completion, execute would free only one page
+            self._connection.executescript("PRAGMA incremental_vacuum")
+        else:
+            self._connection.execute("VACUUM")
+
+
+metadata_store = MetadataStore(
+    METADATA_STORE_PATH,
+    METADATA_STORE_TTL,
+    METADATA_STORE_MAX_ROWS,
+    METADATA_STORE_FLUSH_INTERVAL,
+    METADATA_STORE_COMPACT_INTERVAL,
+)
@@ -0,0 +1,196 @@
+"""
+Provides the bot persistence, keeping conversations and user data across restarts in a local SQLite file.
+
+Includes:
+- One row per user, written only when their data changed.
+- Batched writes of all changes since the last persistence update, in a dedicated thread.
+- Lazy loading of each user's data, the first time one of their updates is processed.
+- Storage of in-progress conversations only (ended ones are deleted).
+"""
+
+import asyncio, json, pickle, sqlite3
+
+from concurrent.futures import ThreadPoolExecutor
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from config import PERSISTENCE_PATH, PERSISTENCE_UPDATE_INTERVAL
+
+
+class SQLitePersistence(BasePersistence):
+    """Stores user data (pickled) and conversation states in SQLite.
+    Chat data, bot data and callback data aren't used by the bot, so aren't stored."""
+
+    def __init__(self, path: str, update_interval: float):
+        super().__init__(
+            store_data=PersistenceInput(
+                bot_data=False, chat_data=False, user_data=True, callback_data=False
+            ),
+            update_interval=update_interval,
+        )
+        self.path = path
+        self._connection = None
+        self._executor = None
+        self._loaded_users = set()
+        self._pending_users = {}
+        self._pending_conversations = {}
+        self._write_task = None
+
+    async def _run(self, function, *args):
+        """Runs a function in the database thread, opening the database first if needed."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="persistence"
+            )
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._open)
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, function, *args
+        )
+
+    def _open(self) -> None:
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS user_data (user_id INTEGER PRIMARY KEY, data BLOB NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS conversations "
+            "(name TEXT NOT NULL, key TEXT NOT NULL, state TEXT NOT NULL, PRIMARY KEY (name, key))"
+        )
+        self._connection.commit()
+
+    async def get_user_data(self) -> dict:
+        # Each user's data is loaded by refresh_user_data, so startup doesn't depend on the users count
+        return {}
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        """Loads the stored data of the user, if it wasn't loaded yet."""
+        if user_id in self._loaded_users:
+            return
+
+        if (data := await self._run(self._select_user_data, user_id)) is not None:
+            # Data changed in memory while loading is more recent than the stored one
+            for key, value in pickle.loads(data).items():
+                user_data.setdefault(key, value)
+
+        self._loaded_users.add(user_id)
+
+    def _select_user_data(self, user_id: int) -> bytes | None:
+        row = self._connection.execute(
+            "SELECT data FROM user_data WHERE user_id = ?", (user_id,)
+        ).fetchone()
+
+        return row[0] if row else None
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        self._pending_users[user_id] = data
+        self._schedule_write()
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._pending_users[user_id] = None
+        self._schedule_write()
+
+    async def get_conversations(self, name: str) -> dict:
+        rows = await self._run(
+            lambda: self._connection.execute(
+                "SELECT key, state FROM conversations WHERE name = ?", (name,)
+            ).fetchall()
+        )
+
+        return {tuple(json.loads(key)): json.loads(state) for key, state in rows}
+
+    async def update_conversation(self, name: str, key: tuple, new_state) -> None:
+        self._pending_conversations[(name, json.dumps(key))] = new_state
+        self._schedule_write()
+
+    def _schedule_write(self) -> None:
+        if self._write_task is None or self._write_task.done():
+            self._write_task = asyncio.create_task(self._write_pending())
+
+    async def _write_pending(self) -> None:
+        """Writes all pending changes, a transaction per batch, until none are left.
+        Changes queued during a write are written by the next batch."""
+        # Let the application queue the rest of the changes of its persistence update first
+        await asyncio.sleep(0)
+
+        while self._pending_users or self._pending_conversations:
+            users, self._pending_users = self._pending_users, {}
+            conversations, self._pending_conversations = self._pending_conversations, {}
+
+            await self._run(self._write, users, conversations)
+
+    def _write(self, users: dict, conversations: dict) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO user_data (user_id, data) VALUES (?, ?)",
+                (
+                    (user_id, pickle.dumps(data))
+                    for user_id, data in users.items()
+                    if data is not None
+                ),
+            )
+            self._connection.executemany(
+                "DELETE FROM user_data WHERE user_id = ?",
+                ((user_id,) for user_id, data in users.items() if data is None),
+            )
+
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO conversations (name, key, state) VALUES (?, ?, ?)",
+                (
+                    (name, key, json.dumps(state))
+                    for (name, key), state in conversations.items()
+                    if state is not None
+                ),
+            )
+            self._connection.executemany(
+                "DELETE FROM conversations WHERE name = ? AND key = ?",
+                (
+                    (name, key)
+                    for (name, key), state in conversations.items()
+                    if state is None
+                ),
+            )
+
+    async def flush(self) -> None:
+        """Writes pending changes and closes the database, on application shutdown."""
+        if self._write_task:
+            await self._write_task
+        await self._write_pending()
+
+        if self._executor is not None:
+            await self._run(self._connection.close)
+            self._executor.shutdown()
+            self._executor = None
+
+    # Chat data, bot data and callback data aren't stored
+
+    async def get_chat_data(self) -> dict:
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return {}
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        pass
+
+    async def update_bot_data(self, data: dict) -> None:
+        pass
+
+    async def update_callback_data(self, data) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        pass
+
+
+persistence = SQLitePersistence(PERSISTENCE_PATH, PERSISTENCE_UPDATE_INTERVAL)
@@ -0,0 +1,104 @@
+"""
+Provides a compact representation of a playlist's videos, kept in user data during the conversation.
+
+Includes:
+- Video IDs packed in a single byte array (11 bytes per video), instead of a list of URL strings.
+- Availability of the videos as a bitmap.
+- Views on a selection of the videos, holding their indices (or only a range) instead of copies of their URLs.
+- Rebuilding of the video URLs only when they're read (e.g. to format a message).
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import filterfalse
+
+from utils.yt_helpers import get_video_id
+
+VIDEO_ID_LENGTH = 11
+
+
+def build_video_url(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+class PlaylistVideos:
+    """Video IDs of a playlist, in the playlist order, with a bitmap of the unavailable ones."""
+
+    def __init__(self):
+        self._ids = bytearray()
+        self._unavailable = bytearray()
+
+    def __len__(self) -> int:
+        return len(self._ids) // VIDEO_ID_LENGTH
+
+    def extend(self, videos_urls: Iterable[str]) -> dict[str, list[int]]:
+        """Appends the videos, as available, and returns the indices of each added URL.
+        URLs that aren't of a YouTube video are skipped, so have no index."""
+        added_videos = {}
+
+        for video_url in videos_urls:
+            if video_id := get_video_id(video_url):
+                added_videos.setdefault(video_url, []).append(len(self))
+                self._ids += video_id.encode("ascii")
+
+        self._unavailable.extend(bytes((len(self) + 7) // 8 - len(self._unavailable)))
+
+        return added_videos
+
+    def get_id(self, index: int) -> str:
+        start = index * VIDEO_ID_LENGTH
+        return self._ids[start : start + VIDEO_ID_LENGTH].decode("ascii")
+
+    def get_url(self, index: int) -> str:
+        return build_video_url(self.get_id(index))
+
+    def set_unavailable(self, index: int) -> None:
+        self._unavailable[index >> 3] |= 1 << (index & 7)
+
+    def is_available(self, index: int) -> bool:
+        return not self._unavailable[index >> 3] & 1 << (index & 7)
+
+    def available(self) -> "VideosView":
+        if not any(self._unavailable):
+            return VideosView(self, range(len(self)))
+
+        return VideosView(self, array("I", filter(self.is_available, range(len(self)))))
+
+    def unavailable(self) -> "VideosView":
+        return VideosView(
+            self, array("I", filterfalse(self.is_available, range(len(self))))
+        )
+
+
+class VideosView(Sequence[str]):
+    """Read-only sequence of the URLs of some videos of a playlist, given by their indices in it."""
+
+    def __init__(self, videos: PlaylistVideos, indices: array | range):
+        self.videos = videos
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return VideosView(self.videos, self.indices[position])
+
+        return self.videos.get_url(self.indices[position])
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self.videos.get_url, self.indices)
+
+    def select(self, ranges: Iterable[range]) -> "VideosView":
+        """Returns a view on the videos in the given ranges of positions (0-based) in this view.
+        A single range of a view without hidden videos stays a range, so isn't copied at all.
+        """
+        ranges = list(ranges)
+        if len(ranges) == 1:
+            return self[ranges[0].start : ranges[0].stop]
+
+        indices = array("I")
+        for positions in ranges:
+            indices.extend(self.indices[positions.start : positions.stop])
+
+        return VideosView(self.videos, indices)
@@ -0,0 +1,225 @@
+"""
+Provides a scheduler for all outbound Telegram requests, plugged into the bot as its rate limiter.
+
+Includes:
+- Token buckets limiting requests globally and per chat (stricter for groups).
+- Priorities, so interactive replies go before bulk output (e.g. infos of every playlist video).
+- Rescheduling of requests that Telegram answered with RetryAfter.
+- Queue depth and waiting time statistics.
+"""
+
+import asyncio, bisect, itertools, time
+
+from datetime import timedelta
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from config import (
+    SEND_CHAT_BURST,
+    SEND_CHAT_RATE,
+    SEND_GLOBAL_RATE,
+    SEND_GROUP_RATE,
+    SEND_MAX_RETRIES,
+)
+
+# Request priorities, passed as rate_limit_args to bot methods (lower goes first)
+INTERACTIVE_PRIORITY = 0
+BULK_PRIORITY = 1
+
+# Number of per-chat buckets above which the idle ones are dropped
+MAX_IDLE_CHAT_BUCKETS = 10_000
+
+
+class TokenBucket:
+    """Allows up to capacity requests at once, refilled at rate requests per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Returns how many seconds until a request can be made (0 if it can be made now)."""
+        self._refill(now)
+        return max(self.paused_until - now, (1 - self.tokens) / self.rate, 0)
+
+    def consume(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def pause(self, seconds: float) -> None:
+        """Blocks requests for the given seconds, as asked by Telegram."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def is_idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity and self.paused_until <= now
+
+
+class SendScheduler(BaseRateLimiter[int]):
+    """Queues requests by priority and releases each one when both the global and its chat's bucket allow.
+    Requests to other endpoints than chat ones only go through the global bucket."""
+
+    def __init__(
+        self,
+        global_rate: float,
+        chat_rate: float,
+        group_rate: float,
+        chat_burst: int,
+        max_retries: int,
+    ):
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self._global_bucket = TokenBucket(global_rate, global_rate)
+        self._chat_buckets = {}
+        self._queue = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._dispatcher = None
+        self._sent = 0
+        self._waits = 0
+        self._retries = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    async def initialize(self) -> None:
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def shutdown(self) -> None:
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+
+    def _get_chat_bucket(self, chat_id) -> TokenBucket | None:
+        if chat_id is None:
+            return None
+
+        if (bucket := self._chat_buckets.get(chat_id)) is None:
+            if len(self._chat_buckets) >= MAX_IDLE_CHAT_BUCKETS:
+                now = time.monotonic()
+                self._chat_buckets = {
+                    id: bucket
+                    for id, bucket in self._chat_buckets.items()
+                    if not bucket.is_idle(now)
+                }
+
+            # Group chats have negative IDs (or are referred by @username)
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            bucket = self._chat_buckets[chat_id] = TokenBucket(
+                self.group_rate if is_group else self.chat_rate,
+                1 if is_group else self.chat_burst,
+            )
+
+        return bucket
+
+    async def _dispatch(self) -> None:
+        """Releases queued requests, in priority order, as the buckets allow."""
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            next_wait_time = None
+
+            for i, (_, _, chat_bucket, release) in enumerate(self._queue):
+                if release.done():
+                    del self._queue[i]
+                    break
+
+                wait_time = max(
+                    self._global_bucket.wait_time(now),
+                    chat_bucket.wait_time(now) if chat_bucket else 0,
+                )
+
+                if wait_time == 0:
+                    self._global_bucket.consume(now)
+                    if chat_bucket:
+                        chat_bucket.consume(now)
+
+                    del self._queue[i]
+                    release.set_result(None)
+                    break
+
+                if next_wait_time is None or wait_time < next_wait_time:
+                    next_wait_time = wait_time
+            else:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), next_wait_time)
+                except asyncio.TimeoutError:
+                    pass
+
+            # Let released requests start before releasing more
+            await asyncio.sleep(0)
+
+    async def _wait_turn(self, priority: int, chat_bucket: TokenBucket | None) -> None:
+        release = asyncio.get_running_loop().create_future()
+        bisect.insort(
+            self._queue,
+            (priority, next(self._sequence), chat_bucket, release),
+            key=lambda request: request[:2],
+        )
+        self._wakeup.set()
+
+        queued_time = time.monotonic()
+        try:
+            await release
+        finally:
+            # If the caller was cancelled, the dispatcher drops the request
+            release.cancel()
+
+        wait_time = time.monotonic() - queued_time
+        self._waits += 1
+        self._total_wait_time += wait_time
+        self._max_wait_time = max(self._max_wait_time, wait_time)
+
+    async def process_request(
+        self, callback, args, kwargs, endpoint, data, rate_limit_args
+    ):
+        """Waits for the request's turn, then sends it, rescheduling it if Telegram asks to retry after some time."""
+        priority = INTERACTIVE_PRIORITY if rate_limit_args is None else rate_limit_args
+        chat_bucket = self._get_chat_bucket(data.get("chat_id"))
+
+        for retry in range(self.max_retries + 1):
+            await self._wait_turn(priority, chat_bucket)
+
+            try:
+                result = await callback(*args, **kwargs)
+                self._sent += 1
+                return result
+            except RetryAfter as e:
+                if retry == self.max_retries:
+                    raise
+
+                retry_after = e.retry_after
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+
+                print(f"Telegram asked to retry {endpoint} after {retry_after}s")
+                self._retries += 1
+                (chat_bucket or self._global_bucket).pause(retry_after)
+
+    def stats(self) -> dict[str, int | float]:
+        """Returns the queue depth, sent requests, retries and waiting times in seconds."""
+        return {
+            "queue depth": len(self._queue),
+            "sent": self._sent,
+            "retries": self._retries,
+            "average wait time": (
+                self._total_wait_time / self._waits if self._waits else 0
+            ),
+            "max wait time": self._max_wait_time,
+        }
+
+
+send_scheduler = SendScheduler(
+    SEND_GLOBAL_RATE, SEND_CHAT_RATE, SEND_GROUP_RATE, SEND_CHAT_BURST, SEND_MAX_RETRIES
+)
@@ -0,0 +1,84 @@
+"""
+Provides the update processor deciding which Telegram updates are processed concurrently.
+
+Includes:
+- Concurrent processing of updates from different users.
+- In-order processing of updates from the same user in the same chat, as ConversationHandler needs.
+- Immediate processing of /cancel when the user has a running operation, so it can stop it.
+- A processing slot taken only once the user's previous updates are processed.
+"""
+
+import asyncio
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from utils.cancellation import cancellation_registry
+
+
+def is_cancel_command(update: object) -> bool:
+    """Returns True if the update is a /cancel command message."""
+    if not (isinstance(update, Update) and update.message and update.message.text):
+        return False
+
+    # The command may be addressed to the bot (/cancel@bot_username)
+    return update.message.text.split()[0].split("@")[0] == "/cancel"
+
+
+def get_update_key(update: object) -> tuple[int | None, int | None] | None:
+    """Returns the (chat ID, user ID) of the update, or None if it has neither."""
+    if not isinstance(update, Update) or not (
+        update.effective_chat or update.effective_user
+    ):
+        return None
+
+    return (
+        update.effective_chat.id if update.effective_chat else None,
+        update.effective_user.id if update.effective_user else None,
+    )
+
+
+class UserOrderedUpdateProcessor(BaseUpdateProcessor):
+    """Processes each (chat, user) updates one at a time, and different (chat, user) concurrently.
+    /cancel commands skip the line when the user has a running operation to cancel.
+    At most max_concurrent_updates are processed at once, and max_pending_updates are accepted
+    at once, counting the ones waiting for their user's previous updates."""
+
+    def __init__(self, max_concurrent_updates: int, max_pending_updates: int):
+        if max_concurrent_updates < 1:
+            raise ValueError("max_concurrent_updates must be a positive integer")
+
+        # The base class limits the accepted updates, the processed ones are limited here
+        super().__init__(max_pending_updates)
+        self._processing = asyncio.Semaphore(max_concurrent_updates)
+        self._locks = {}
+
+    async def do_process_update(self, update, coroutine) -> None:
+        """Waits for the user's previous updates before taking a processing slot, so updates
+        queued behind a long operation don't hold slots other users need."""
+        if (key := get_update_key(update)) is None:
+            async with self._processing:
+                await coroutine
+            return
+
+        # Not limited, and not waiting for the operation it cancels
+        if is_cancel_command(update) and cancellation_registry.is_running(*key):
+            await coroutine
+            return
+
+        # Lock and number of updates using it
+        lock = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        lock[1] += 1
+        try:
+            async with lock[0], self._processing:
+                await coroutine
+        finally:
+            lock[1] -= 1
+            if not lock[1]:
+                del self._locks[key]
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
@@ -0,0 +1,138 @@
+"""
+Provides the statistics of multiple videos' infos (e.g. the selected videos of a playlist).
+
+Includes:
+- Collection of each video's statistical infos into typed columns, copied into a NumPy array once.
+- Totals, averages, medians, percentiles and minimums/maximums (with their video), computed for all columns at once.
+- Engagement ratios (e.g. likes per view).
+- Missing infos masked out, so they don't count as zeros.
+"""
+
+from array import array
+from collections.abc import Sequence
+
+import numpy as np
+
+# Percentiles reported besides the median
+STATISTICS_PERCENTILES = (10, 90)
+
+# Engagement ratios reported when both their info options are selected: (name, numerator, denominator)
+ENGAGEMENT_RATIOS = [
+    ("likes per view", "likes count", "views count"),
+    ("comments per view", "comments count", "views count"),
+    ("comments per like", "comments count", "likes count"),
+]
+
+
+def to_number(value: float) -> int | float:
+    return int(value) if float(value).is_integer() else round(float(value), 2)
+
+
+class VideosStatistics:
+    """Collects the given statistical info options of videos, in the order they're added."""
+
+    def __init__(self, info_options: list[str]):
+        self.info_options = list(info_options)
+        # One array of floats per info option, missing infos being NaN
+        self._columns = {option: array("d") for option in self.info_options}
+
+    def __len__(self) -> int:
+        return len(self._columns[self.info_options[0]]) if self.info_options else 0
+
+    def add(self, video_infos: dict | None) -> None:
+        """Adds a video's infos (None if they couldn't be fetched)."""
+        video_infos = video_infos or {}
+        for option, column in self._columns.items():
+            value = video_infos.get(option)
+            column.append(float("nan") if value is None else value)
+
+    def report(
+        self, videos_urls: Sequence[str]
+    ) -> dict[str, dict[str, int | float | str]]:
+        """Returns the infos of each statistics section (e.g. "Total"), ready for format_infos.
+        videos_urls are the added videos' URLs, in order, to link the extreme ones."""
+        if not len(self):
+            return {}
+
+        # Rows are info options and columns are videos
+        values = np.array([np.array(column) for column in self._columns.values()])
+        present = ~np.isnan(values)
+        counts = present.sum(axis=1)
+        rows = np.flatnonzero(counts)
+
+        if not rows.size:
+            return {}
+
+        options = [self.info_options[row] for row in rows]
+        values = values[rows]
+        present = present[rows]
+        counts = counts[rows]
+        row_indices = np.arange(len(options))
+
+        totals = np.where(present, values, 0).sum(axis=1)
+        minimum_positions = np.where(present, values, np.inf).argmin(axis=1)
+        maximum_positions = np.where(present, values, -np.inf).argmax(axis=1)
+        minimums = values[row_indices, minimum_positions]
+        maximums = values[row_indices, maximum_positions]
+
+        # Sorted once for all percentiles, NaNs being sorted last
+        sorted_values = np.sort(values, axis=1)
+
+        def get_percentiles(percentile: float) -> np.ndarray:
+            """Linear interpolation between the closest ranks, as np.percentile does."""
+            ranks = (counts - 1) * percentile / 100
+            lower_ranks = np.floor(ranks).astype(int)
+            upper_ranks = np.ceil(ranks).astype(int)
+            lower_values = sorted_values[row_indices, lower_ranks]
+            upper_values = sorted_values[row_indices, upper_ranks]
+            return lower_values + (upper_values - lower_values) * (ranks - lower_ranks)
+
+        medians = get_percentiles(50)
+        percentiles = [
+            get_percentiles(percentile) for percentile in STATISTICS_PERCENTILES
+        ]
+
+        report = {
+            "Total": dict(zip(options, map(to_number, totals))),
+            "Average": dict(zip(options, map(to_number, totals / counts))),
+            "Median": dict(zip(options, map(to_number, medians))),
+        }
+
+        for percentile, percentile_values in zip(STATISTICS_PERCENTILES, percentiles):
+            report[f"{percentile}th Percentile"] = dict(
+                zip(options, map(to_number, percentile_values))
+            )
+
+        for name, positions, extremes in (
+            ("Minimum", minimum_positions, minimums),
+            ("Maximum", maximum_positions, maximums),
+        ):
+            extremes_infos = {}
+            for option, position, value in zip(options, positions, extremes):
+                # format_infos doesn't show zero values, so neither their video
+                if value:
+                    extremes_infos[option] = to_number(value)
+                    extremes_infos[f"{option} video"] = videos_urls[int(position)]
+
+            if extremes_infos:
+                report[name] = extremes_infos
+
+        engagement = {}
+        for name, numerator, denominator in ENGAGEMENT_RATIOS:
+            if numerator not in options or denominator not in options:
+                continue
+
+            # Only videos having both infos count
+            i, j = options.index(numerator), options.index(denominator)
+            videos = present[i] & present[j]
+            if (denominator_total := values[j, videos].sum()) > 0:
+                ratio = values[i, videos].sum() / denominator_total
+                engagement[name] = f"{ratio:.2%}"
+
+        if engagement:
+            report["Engagement"] = engagement
+
+        # Sections with only zeros would have nothing shown by format_infos
+        return {
+            section: infos for section, infos in report.items() if any(infos.values())
+        }
@@ -0,0 +1,122 @@
+"""
+Provides a thread-safe pool of reusable yt_dlp.YoutubeDL instances.
+
+Includes:
+- Option profiles used by the extraction helpers (flat, playlist, full and channel).
+- Checkout/return of long-lived instances, so cookies, extractors and HTTP connections are reused.
+- Size and utilisation statistics for each profile.
+"""
+
+import threading, yt_dlp
+
+from contextlib import contextmanager
+
+from config import YDL_POOL_SIZE
+
+# yt_dlp options for each kind of extraction
+YDL_PROFILES = {
+    # Only get URLs, no extra info
+    "flat": {
+        "quiet": True,
+        "noprogress": True,
+        "extract_flat": True,
+        "force_generic_extractor": True,  # Prevents unnecessary API calls
+        "cookiefile": "cookies.txt",
+    },
+    # Playlist entries, enumerated page by page as they're iterated (not pooled, see iter_playlist_entries)
+    "playlist": {
+        "quiet": True,
+        "noprogress": True,
+        "extract_flat": True,
+        "lazy_playlist": True,
+        "cookiefile": "cookies.txt",
+    },
+    # Full metadata of a single video
+    "full": {
+        "quiet": True,
+        "no_warnings": True,
+        "skip_download": True,
+        "extract_flat": False,
+        "force_generic_extractor": False,
+        "cookiefile": "cookies.txt",
+    },
+    # Channel name and handle
+    "channel": {
+        "quiet": True,
+        "extract_flat": True,
+        "cookiefile": "cookies.txt",
+    },
+}
+
+
+class YoutubeDLPool:
+    """Keeps up to max_size YoutubeDL instances per profile.
+    An instance is used by only one thread at a time, between checkout and return."""
+
+    def __init__(self, profiles: dict[str, dict], max_size: int):
+        self._profiles = profiles
+        self._max_size = max_size
+        self._idle = {profile: [] for profile in profiles}
+        self._created = {profile: 0 for profile in profiles}
+        self._in_use = {profile: 0 for profile in profiles}
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def checkout(self, profile: str):
+        """Borrow an instance of the profile, blocking while all of them are in use."""
+        ydl = self._acquire(profile)
+        try:
+            yield ydl
+        finally:
+            self._release(profile, ydl)
+
+    def _acquire(self, profile: str) -> yt_dlp.YoutubeDL:
+        with self._condition:
+            while True:
+                if self._idle[profile]:
+                    ydl = self._idle[profile].pop()
+                    break
+
+                if self._created[profile] < self._max_size:
+                    # Reserve the slot before releasing the lock to build the instance
+                    self._created[profile] += 1
+                    ydl = None
+                    break
+
+                self._condition.wait()
+
+            self._in_use[profile] += 1
+
+        if ydl is None:
+            try:
+                ydl = yt_dlp.YoutubeDL(self._profiles[profile])
+            except Exception:
+                with self._condition:
+                    self._created[profile] -= 1
+                    self._in_use[profile] -= 1
+                    self._condition.notify()
+                raise
+
+        return ydl
+
+    def _release(self, profile: str, ydl: yt_dlp.YoutubeDL) -> None:
+        with self._condition:
+            self._in_use[profile] -= 1
+            self._idle[profile].append(ydl)
+            self._condition.notify()
+
+    def stats(self) -> dict[str, dict[str, int | float]]:
+        """Returns, for each profile, how many instances exist, are in use, and the utilisation ratio."""
+        with self._condition:
+            return {
+                profile: {
+                    "size": self._created[profile],
+                    "max size": self._max_size,
+                    "in use": self._in_use[profile],
+                    "utilisation": self._in_use[profile] / self._max_size,
+                }
+                for profile in self._profiles
+            }
+
+
+ydl_pool = YoutubeDLPool(YDL_PROFILES, YDL_POOL_SIZE)
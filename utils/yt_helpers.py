@@ -2,74 +2,154 @@
 Provides helper functions for validating YouTube URLs and fetching metadata using yt_dlp and the YouTube Data API.
 
 Includes:
-- URL format validation and ID extraction.
-- Detection of URL type (video or playlist).
-- Fetching of video and playlist URLs, including detection of unavailable videos.
+- Single pass URL parsing: format validation, type (video or playlist) and ID extraction.
+- Fetching of video and playlist URLs (also page by page), including detection of unavailable videos.
 - Fetching of metadata for individual videos and playlists.
 - Asynchronous support for efficient network-bound operations.
 """
 
-import aiohttp, asyncio, re, yt_dlp
-
-from config import YOUTUBE_API_KEY
-
-
-def is_valid_youtube_url_format(url: str) -> bool:
-    """Returns True if the URL is a valid YouTube video, shorts, or playlist URL.
-    Considers the video ID to have always 11 characters."""
-    pattern = r"""
-        ^(?:https?://)?                  # Optional https
-        (?:
-            (?:www\.|m\.)?youtube\.com   # Optional www. or m. subdomains
-            /(?:
-                watch                    # Video URLs
-                (?:\?.*?)?               # Optional extra parameters before v or list
-                (?=.*[?&]v=([\w-]{11}))  # Video ID (v=) required somewhere
-                (?:[?&][\w-]+=[\w-]*)*   # Optional extra parameters
-            |
-                shorts/([\w-]{11})       # Shorts URLs
-                (?:\?.*)?                # Optional extra parameters
-            |
-                playlist\?               # Playlist URLs
-                (?:[?&]?list=([\w-]+))   # Playlist ID (list=) required somewhere
-                (?:[?&][\w-]+=[\w-]*)*   # Optional extra parameters
-            )
-        |
-            youtu\.be/([\w-]{11})        # Shortened URLs
-            (?:\?.*)?                    # Optional extra parameters
-        )
-        $"""
+import aiohttp, asyncio, functools, re, yt_dlp
 
-    pattern = re.compile(pattern, re.VERBOSE | re.IGNORECASE)
-    return bool(pattern.match(url))
+from collections import deque
+from contextlib import aclosing
+from collections.abc import AsyncIterator, Callable, Iterable
+from typing import NamedTuple
 
+from config import (
+    AVAILABILITY_BACKEND,
+    PLAYLIST_BACKEND,
+    PLAYLIST_PAGE_SIZE,
+    YOUTUBE_API_KEY,
+)
 
-def get_youtube_url_type(url: str) -> str | None:
-    """Determine if a YouTube URL is a 'video' or 'playlist'."""
-    if "playlist" in url and re.search(r"[?&]list=([a-zA-Z0-9_-]+)", url):
-        return "playlist"
+from utils.extraction_engine import ExtractionBusyError, extraction_engine
+from utils.http_sessions import http_sessions
+from utils.metadata_cache import video_infos_cache
+from utils.metadata_store import metadata_store
 
-    if re.search(
-        r"(?:youtube\.com\/(?:[^\/]+\/[^\/]+\/|(?:v|shorts)\/|.*[?&]v=)|youtu\.be\/)([a-zA-Z0-9_-]{11})",
-        url,
-    ):
-        return "video"
+# Maximum number of video IDs in a single YouTube Data API videos.list request
+VIDEOS_LIST_MAX_IDS = 50
+# Maximum number of items in a single YouTube Data API playlistItems.list page
+PLAYLIST_ITEMS_MAX_RESULTS = 50
 
-    return None
+DATA_API_URL = "https://www.googleapis.com/youtube/v3"
+# Google only compresses responses if the user agent also contains "gzip"
+DATA_API_HEADERS = {
+    "Accept-Encoding": "gzip",
+    "User-Agent": "youtube-telegram-bot (gzip)",
+}
 
+# Shared fetches currently running, by (operation, ID)
+in_flight_fetches: dict[tuple, "SharedFetch"] = {}
 
-def get_youtube_url_id(url: str, yt_type: str) -> str | None:
-    """Extract the ID from a YouTube URL based on the type ('video' or 'playlist')."""
-    patterns = {
-        "playlist": r"[?&]list=([a-zA-Z0-9_-]+)",
-        "video": r"(?:youtube\.com\/(?:[^\/]+\/[^\/]+\/|(?:v|shorts)\/|.*[?&]v=)|youtu\.be\/)([a-zA-Z0-9_-]{11})",
-    }
 
-    match = re.search(patterns.get(yt_type), url)
+class SharedFetch:
+    """A fetch task awaited by one or more callers."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+def single_flight(operation: str, key: Callable | None = None):
+    """Makes concurrent calls with the same (operation, ID) share a single running fetch.
+    The ID is the call arguments, or what key returns for them.
+    A cancelled caller only cancels the shared fetch if no other caller is waiting for it.
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        async def wrapper(*args):
+            flight_key = (operation, key(*args) if key else args)
+
+            if not (shared_fetch := in_flight_fetches.get(flight_key)):
+                shared_fetch = SharedFetch(asyncio.create_task(function(*args)))
+                in_flight_fetches[flight_key] = shared_fetch
+
+                def forget_fetch(_):
+                    if in_flight_fetches.get(flight_key) is shared_fetch:
+                        del in_flight_fetches[flight_key]
+
+                shared_fetch.task.add_done_callback(forget_fetch)
+
+            shared_fetch.waiters += 1
+            try:
+                return await asyncio.shield(shared_fetch.task)
+            except asyncio.CancelledError:
+                if shared_fetch.waiters == 1 and not shared_fetch.task.done():
+                    in_flight_fetches.pop(flight_key, None)
+                    shared_fetch.task.cancel()
+                raise
+            finally:
+                shared_fetch.waiters -= 1
 
-    return match.group(1) if match else None
+        return wrapper
 
+    return decorator
 
+
+class YouTubeUrl(NamedTuple):
+    """A parsed YouTube URL."""
+
+    type: str
+    id: str
+    canonical_url: str
+
+
+# Valid YouTube video, shorts, or playlist URL, considering the video ID to have always 11 characters
+YOUTUBE_URL_PATTERN = re.compile(
+    r"""
+    ^(?:https?://)?                                 # Optional https
+    (?:
+        (?:www\.|m\.)?youtube\.com                  # Optional www. or m. subdomains
+        /(?:
+            watch                                   # Video URLs
+            (?:\?.*)?                               # Optional extra parameters before the last v
+            (?=[?&]v=(?P<video_id>[\w-]{11}))       # Video ID (v=) required
+            (?:[?&][\w-]+=[\w-]*)*                  # Optional extra parameters
+        |
+            shorts/(?P<shorts_id>[\w-]{11})         # Shorts URLs
+            (?:\?.*)?                               # Optional extra parameters
+        |
+            playlist\?                              # Playlist URLs
+            (?:[?&]?list=(?P<playlist_id>[\w-]+))   # Playlist ID (list=) required
+            (?:[?&][\w-]+=[\w-]*)*                  # Optional extra parameters
+        )
+    |
+        youtu\.be/(?P<short_url_id>[\w-]{11})       # Shortened URLs
+        (?:\?.*)?                                   # Optional extra parameters
+    )
+    $""",
+    re.VERBOSE | re.IGNORECASE | re.ASCII,
+)
+
+
+def parse_youtube_url(url: str) -> YouTubeUrl | None:
+    """Returns the type ('video' or 'playlist'), ID and canonical URL of a YouTube URL, in a single match.
+    Returns None if it isn't a valid YouTube video, shorts, or playlist URL."""
+    if not (match := YOUTUBE_URL_PATTERN.match(url)):
+        return None
+
+    if playlist_id := match["playlist_id"]:
+        return YouTubeUrl(
+            "playlist",
+            playlist_id,
+            f"https://www.youtube.com/playlist?list={playlist_id}",
+        )
+
+    video_id = match["video_id"] or match["shorts_id"] or match["short_url_id"]
+    return YouTubeUrl("video", video_id, f"https://www.youtube.com/watch?v={video_id}")
+
+
+def get_video_id(video_url: str) -> str | None:
+    """Returns the ID of a YouTube video URL, or None if it isn't one."""
+    if (parsed_url := parse_youtube_url(video_url)) and parsed_url.type == "video":
+        return parsed_url.id
+
+    return None
+
+
+@single_flight("videos urls")
 async def get_videos_urls(type: str, id: str) -> list[str] | None:
     """
     Validate YouTube video or playlist ID and return a list of video URLs.
@@ -77,18 +157,17 @@ async def get_videos_urls(type: str, id: str) -> list[str] | None:
     - If it's a video, return [video URL] (unless video is blocked or unavailable).
     - If it's a playlist, return all video URLs (even blocked or unavailable ones).
     """
-    url = f"https://www.youtube.com/{'watch?v=' + id if type == 'video' else 'playlist?list=' + id}"
+    if type == "playlist" and PLAYLIST_BACKEND == "data_api" and YOUTUBE_API_KEY:
+        videos_urls = [
+            url async for page in iter_playlist_videos_urls_data_api(id) for url in page
+        ]
+        return videos_urls or None
 
-    yt_dlp_options = {
-        "quiet": True,
-        "extract_flat": True,  # Only get URLs, no extra info
-        "force_generic_extractor": True,  # Prevents unnecessary API calls
-        "cookiefile": "cookies.txt",
-    }
+    url = f"https://www.youtube.com/{'watch?v=' + id if type == 'video' else 'playlist?list=' + id}"
 
     try:
-        info = await asyncio.to_thread(
-            lambda: yt_dlp.YoutubeDL(yt_dlp_options).extract_info(url, download=False)
+        info = await extraction_engine.extract(
+            "flat", url, fields=("webpage_url", "entries")
         )
 
         if type == "video":
@@ -102,76 +181,448 @@ async def get_videos_urls(type: str, id: str) -> list[str] | None:
     return None
 
 
+async def iter_playlist_videos_urls_yt_dlp(
+    playlist_id: str, page_size: int = PLAYLIST_PAGE_SIZE
+) -> AsyncIterator[list[str]]:
+    """Yield the playlist video URLs (even blocked or unavailable ones) page by page, as yt_dlp lists them.
+    Yields nothing if the playlist is invalid, and stops early if listing fails."""
+    url = f"https://www.youtube.com/playlist?list={playlist_id}"
+
+    try:
+        async with aclosing(
+            extraction_engine.iter_entries("playlist", url, page_size)
+        ) as pages:
+            async for entries in pages:
+                yield [entry["url"] for entry in entries if "url" in entry]
+    except yt_dlp.utils.DownloadError as e:
+        print(f"Error listing playlist {playlist_id} videos: {e}")
+
+
+async def iter_playlist_videos_urls_data_api(
+    playlist_id: str,
+) -> AsyncIterator[list[str]]:
+    """Yield the playlist video URLs (even blocked or unavailable ones) page by page, using YouTube Data API v3.
+    Pages stored from previous listings are requested with their ETag, so unchanged ones aren't sent again.
+    Yields nothing if the playlist is invalid, and stops early if listing fails."""
+    page_token = ""
+
+    while True:
+        page_key = f"{playlist_id}/{page_token}"
+        stored = await metadata_store.get("playlist_pages", page_key)
+
+        params = {
+            "part": "contentDetails",
+            "playlistId": playlist_id,
+            "maxResults": PLAYLIST_ITEMS_MAX_RESULTS,
+            "fields": "etag,nextPageToken,items/contentDetails/videoId",
+            "key": YOUTUBE_API_KEY,
+        }
+        if page_token:
+            params["pageToken"] = page_token
+
+        headers = dict(DATA_API_HEADERS)
+        if stored and stored[0]["etag"]:
+            headers["If-None-Match"] = stored[0]["etag"]
+
+        try:
+            async with http_sessions.get("googleapis").get(
+                f"{DATA_API_URL}/playlistItems", params=params, headers=headers
+            ) as response:
+                if response.status == 304 and stored:
+                    page = stored[0]
+                else:
+                    response.raise_for_status()
+                    data = await response.json()
+                    page = {
+                        "etag": data.get("etag"),
+                        "videos ids": [
+                            item["contentDetails"]["videoId"]
+                            for item in data.get("items", [])
+                            if "videoId" in item.get("contentDetails", {})
+                        ],
+                        "next page token": data.get("nextPageToken"),
+                    }
+        except aiohttp.ClientResponseError as e:
+            # Invalid playlists are "not found"
+            if e.status != 404:
+                print(f"Error listing playlist {playlist_id} videos: {e}")
+            return
+        except aiohttp.ClientError as e:
+            print(f"Error listing playlist {playlist_id} videos: {e}")
+            return
+
+        # Also renews the expiration of unchanged pages
+        metadata_store.put("playlist_pages", page_key, page)
+
+        if page["videos ids"]:
+            yield [
+                f"https://www.youtube.com/watch?v={video_id}"
+                for video_id in page["videos ids"]
+            ]
+
+        if not (page_token := page["next page token"]):
+            return
+
+
+def iter_playlist_videos_urls(playlist_id: str) -> AsyncIterator[list[str]]:
+    """Yield the playlist video URLs (even blocked or unavailable ones) page by page, as they're listed.
+    Lists them with the backend set in PLAYLIST_BACKEND ("yt_dlp" or "data_api")."""
+    if PLAYLIST_BACKEND == "data_api" and YOUTUBE_API_KEY:
+        return iter_playlist_videos_urls_data_api(playlist_id)
+
+    return iter_playlist_videos_urls_yt_dlp(playlist_id)
+
+
+@single_flight("video availability")
 async def is_video_available(video_url: str) -> bool:
     """Returns True if the video is available (not hidden, blocked, removed or private)."""
-    yt_dlp_options = {
-        "quiet": True,
-        "noprogress": True,
-        "extract_flat": True,
-        "force_generic_extractor": True,
-        "cookiefile": "cookies.txt",
-    }
-
     try:
-        await asyncio.to_thread(
-            lambda: yt_dlp.YoutubeDL(yt_dlp_options).extract_info(
-                video_url, download=False
-            )
-        )
+        await extraction_engine.extract("flat", video_url, fields=())
         return True
     except yt_dlp.utils.DownloadError:
         return False
 
 
-async def get_hidden_playlist_videos(
-    videos_urls: list[str], cancel_event: asyncio.Event, max_concurrent_tasks: int = 10
-) -> list[str]:
-    """Return a list of video URLs that are hidden/unavailable in a playlist."""
-    hidden_videos_urls = []
+async def iter_videos_availability_yt_dlp(
+    videos_urls: Iterable[str],
+    cancel_event: asyncio.Event,
+    max_concurrent_tasks: int = 10,
+) -> AsyncIterator[tuple[str, bool]]:
+    """Yield (video URL, is available) for each video, in the order the checks complete, checking each video with yt_dlp.
+    Keeps up to max_concurrent_tasks checks running at all times, and stops as soon as cancel_event is set.
+    """
+    videos_urls = iter(videos_urls)
+    running_tasks = {}
+    cancel_task = asyncio.create_task(cancel_event.wait())
+
+    def start_tasks():
+        while len(running_tasks) < max_concurrent_tasks:
+            if (video_url := next(videos_urls, None)) is None:
+                return
+            task = asyncio.create_task(is_video_available(video_url))
+            running_tasks[task] = video_url
+
+    try:
+        start_tasks()
+
+        while running_tasks:
+            done_tasks, _ = await asyncio.wait(
+                {cancel_task, *running_tasks}, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if cancel_event.is_set():
+                return
+
+            for task in done_tasks:
+                video_url = running_tasks.pop(task)
+
+                # Can't tell if the video is available, so don't report it as available
+                if isinstance(task.exception(), ExtractionBusyError):
+                    raise task.exception()
+
+                # Other errors don't mean the video is hidden
+                yield video_url, task.exception() is not None or task.result()
+
+            start_tasks()
+    finally:
+        cancel_task.cancel()
+        for task in running_tasks:
+            task.cancel()
+
+
+async def get_videos_statuses(videos_ids: list[str]) -> dict[str, dict] | None:
+    """Fetches status and content details of up to 50 videos using YouTube Data API v3.
+    Returns a dictionary by video ID, in which private, removed and blocked videos are missing, or None on error.
+    """
+    url = f"{DATA_API_URL}/videos"
+    params = {
+        "part": "status,contentDetails",
+        "id": ",".join(videos_ids),
+        "maxResults": VIDEOS_LIST_MAX_IDS,
+        "fields": "items(id,status(uploadStatus,privacyStatus),contentDetails(regionRestriction,contentRating/ytRating))",
+        "key": YOUTUBE_API_KEY,
+    }
+
+    try:
+        async with http_sessions.get("googleapis").get(
+            url, params=params, headers=DATA_API_HEADERS
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+    except aiohttp.ClientError as e:
+        print(f"Error fetching videos statuses: {e}")
+        return None
+
+    return {video["id"]: video for video in data.get("items", [])}
+
+
+def is_video_status_available(video: dict) -> bool | None:
+    """Returns if the video is available according to its Data API status and content details.
+    Returns None if it can't be told, because it depends on region, age or processing.
+    """
+    status = video.get("status", {})
+    content_details = video.get("contentDetails", {})
+
+    if status.get("privacyStatus") == "private" or status.get("uploadStatus") in (
+        "deleted",
+        "failed",
+        "rejected",
+    ):
+        return False
+
+    if (
+        status.get("uploadStatus") != "processed"
+        or "regionRestriction" in content_details
+        or content_details.get("contentRating", {}).get("ytRating") == "ytAgeRestricted"
+    ):
+        return None
+
+    return True
+
+
+async def iter_videos_availability_data_api(
+    videos_urls: Iterable[str],
+    cancel_event: asyncio.Event,
+    max_concurrent_tasks: int = 10,
+) -> AsyncIterator[tuple[str, bool]]:
+    """Yield (video URL, is available) for each video, checking up to 50 videos per YouTube Data API request.
+    Videos whose availability can't be told from the API response are then checked with yt_dlp.
+    """
+    videos_urls = list(videos_urls)
+    ambiguous_videos_urls = []
 
-    async def process_batch(batch):
+    for i in range(0, len(videos_urls), VIDEOS_LIST_MAX_IDS):
         if cancel_event.is_set():
             return
 
-        tasks = [is_video_available(url) for url in batch]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        batch = []
+        for video_url in videos_urls[i : i + VIDEOS_LIST_MAX_IDS]:
+            if video_id := get_video_id(video_url):
+                batch.append((video_url, video_id))
+            else:
+                ambiguous_videos_urls.append(video_url)
+
+        if not batch:
+            continue
+
+        videos = await get_videos_statuses(list({video_id for _, video_id in batch}))
+
+        if videos is None:
+            ambiguous_videos_urls.extend(video_url for video_url, _ in batch)
+            continue
 
         if cancel_event.is_set():
             return
 
-        hidden_videos_urls.extend(
-            [batch[i] for i in range(len(batch)) if results[i] is False]
+        for video_url, video_id in batch:
+            # Private, removed and blocked videos are left out of the response
+            is_available = video_id in videos and is_video_status_available(
+                videos[video_id]
+            )
+
+            if is_available is None:
+                ambiguous_videos_urls.append(video_url)
+            else:
+                yield video_url, is_available
+
+    async for result in iter_videos_availability_yt_dlp(
+        ambiguous_videos_urls, cancel_event, max_concurrent_tasks
+    ):
+        yield result
+
+
+def iter_videos_availability(
+    videos_urls: Iterable[str],
+    cancel_event: asyncio.Event,
+    max_concurrent_tasks: int = 10,
+) -> AsyncIterator[tuple[str, bool]]:
+    """Yield (video URL, is available) for each video, in the order the checks complete, stopping if cancel_event is set.
+    The checks use the backend set in AVAILABILITY_BACKEND ("yt_dlp" or "data_api")."""
+    if AVAILABILITY_BACKEND == "data_api" and YOUTUBE_API_KEY:
+        return iter_videos_availability_data_api(
+            videos_urls, cancel_event, max_concurrent_tasks
         )
 
-    batches = [
-        videos_urls[i : i + max_concurrent_tasks]
-        for i in range(0, len(videos_urls), max_concurrent_tasks)
-    ]
+    return iter_videos_availability_yt_dlp(
+        videos_urls, cancel_event, max_concurrent_tasks
+    )
 
-    for batch in batches:
-        if cancel_event.is_set():
-            return []
-        await process_batch(batch)
 
-    return hidden_videos_urls
+async def get_hidden_playlist_videos(
+    videos_urls: list[str], cancel_event: asyncio.Event, max_concurrent_tasks: int = 10
+) -> list[str]:
+    """Return a list of video URLs that are hidden/unavailable in a playlist.
+    Concurrent calls for the same videos share a single scan, which keeps running while any caller still waits for it.
+    """
+    scan_task = asyncio.create_task(
+        scan_hidden_playlist_videos(tuple(videos_urls), max_concurrent_tasks)
+    )
+    cancel_task = asyncio.create_task(cancel_event.wait())
+
+    try:
+        await asyncio.wait(
+            {scan_task, cancel_task}, return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        cancel_task.cancel()
+        scan_task.cancel()
+
+    if cancel_event.is_set():
+        return []
+
+    return scan_task.result()
 
 
+@single_flight("hidden playlist videos")
+async def scan_hidden_playlist_videos(
+    videos_urls: tuple[str], max_concurrent_tasks: int
+) -> list[str]:
+    """Checks all videos and returns the URLs of the hidden/unavailable ones, in the playlist order."""
+    hidden_videos_urls = set()
+
+    # Each caller stops waiting when cancelled, the scan itself is only cancelled by single_flight
+    async for video_url, is_available in iter_videos_availability(
+        videos_urls, asyncio.Event(), max_concurrent_tasks
+    ):
+        if not is_available:
+            hidden_videos_urls.add(video_url)
+
+    return [url for url in videos_urls if url in hidden_videos_urls]
+
+
+@single_flight(
+    "video infos",
+    key=lambda video_url: get_video_id(video_url) or video_url,
+)
 async def get_video_infos(video_url: str) -> dict[str, str] | None:
-    """Fetches video metadata using yt_dlp and returns a dictionary."""
-    yt_dlp_options = {
-        "quiet": True,
-        "no_warnings": True,
-        "skip_download": True,
-        "extract_flat": False,
-        "force_generic_extractor": False,
-        "cookiefile": "cookies.txt",
-    }
+    """Returns video metadata as a dictionary, from the memory cache or the metadata store if possible.
+    If only the cached counters expired, refreshes them through YouTube Data API v3.
+    Else, fetches all metadata using yt_dlp and caches it."""
+    if not (video_id := get_video_id(video_url)):
+        return await fetch_video_infos(video_url)
+
+    infos, are_counters_fresh = video_infos_cache.get(video_id)
+
+    if not infos and (stored := await metadata_store.get_video(video_id)):
+        stored_infos, age, counters_age = stored
+        # Stored static infos older than the cache keeps them are fetched again
+        if age <= video_infos_cache.static_ttl:
+            infos = stored_infos
+            video_infos_cache.put(video_id, infos, age, counters_age)
+            are_counters_fresh = counters_age <= video_infos_cache.counters_ttl
+
+    if infos and are_counters_fresh:
+        return infos
+
+    if infos and (counters := await get_video_counters(video_id)):
+        video_infos_cache.update_counters(video_id, counters)
+        metadata_store.update_video_counters(video_id, counters)
+        return {**infos, **counters}
+
+    if infos := await fetch_video_infos(video_url):
+        video_infos_cache.put(video_id, infos)
+        metadata_store.put("videos", video_id, infos)
+
+    return infos
+
+
+async def iter_videos_infos(
+    videos_urls: Iterable[str], prefetch_count: int, cancel_event: asyncio.Event
+) -> AsyncIterator[dict[str, str] | None]:
+    """Yield the metadata of each video, in the same order as the URLs, stopping as soon as cancel_event is set.
+    Keeps fetching up to prefetch_count videos ahead while the caller handles the previous ones.
+    """
+    videos_urls = iter(videos_urls)
+    prefetch_tasks = deque()
+    cancel_task = asyncio.create_task(cancel_event.wait())
+
+    def start_tasks():
+        while len(prefetch_tasks) < prefetch_count:
+            if (video_url := next(videos_urls, None)) is None:
+                return
+            prefetch_tasks.append(asyncio.create_task(get_video_infos(video_url)))
 
     try:
-        info = await asyncio.to_thread(
-            lambda: yt_dlp.YoutubeDL(yt_dlp_options).extract_info(
-                video_url, download=False
+        start_tasks()
+
+        while prefetch_tasks:
+            await asyncio.wait(
+                {cancel_task, prefetch_tasks[0]}, return_when=asyncio.FIRST_COMPLETED
             )
+
+            if cancel_event.is_set():
+                return
+
+            video_infos = prefetch_tasks.popleft().result()
+            start_tasks()
+            yield video_infos
+    finally:
+        cancel_task.cancel()
+        for task in prefetch_tasks:
+            task.cancel()
+
+
+async def get_video_counters(video_id: str) -> dict[str, int] | None:
+    """Fetches views, likes and comments count of a video using YouTube Data API v3."""
+    if not YOUTUBE_API_KEY:
+        return None
+
+    url = f"{DATA_API_URL}/videos"
+    params = {
+        "part": "statistics",
+        "id": video_id,
+        "fields": "items(statistics(viewCount,likeCount,commentCount))",
+        "key": YOUTUBE_API_KEY,
+    }
+
+    try:
+        async with http_sessions.get("googleapis").get(
+            url, params=params, headers=DATA_API_HEADERS
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+    except aiohttp.ClientError as e:
+        print(f"Error fetching video counters: {e}")
+        return None
+
+    if not data.get("items"):
+        return None
+
+    statistics = data["items"][0].get("statistics", {})
+
+    # Counters hidden by the uploader are missing
+    return {
+        info: int(statistics[field]) if field in statistics else None
+        for info, field in (
+            ("views count", "viewCount"),
+            ("likes count", "likeCount"),
+            ("comments count", "commentCount"),
+        )
+    }
+
+
+# yt_dlp fields used to build the video infos
+VIDEO_INFOS_FIELDS = (
+    "fulltitle",
+    "duration",
+    "view_count",
+    "like_count",
+    "comment_count",
+    "upload_date",
+    "uploader",
+    "uploader_url",
+    "description",
+    "chapters",
+    "thumbnail",
+    "thumbnails",
+)
+
+
+async def fetch_video_infos(video_url: str) -> dict[str, str] | None:
+    """Fetches video metadata using yt_dlp and returns a dictionary."""
+    try:
+        info = await extraction_engine.extract(
+            "full", video_url, fields=VIDEO_INFOS_FIELDS
         )
     except yt_dlp.utils.DownloadError:
         return None
@@ -191,27 +642,49 @@ async def get_video_infos(video_url: str) -> dict[str, str] | None:
         "description": info.get("description"),
         "chapters": info.get("chapters"),
         "thumbnail": info.get("thumbnail"),
+        "thumbnails": get_thumbnail_variants(info.get("thumbnails") or []),
+    }
+
+
+def get_thumbnail_variants(thumbnails: list[dict]) -> list[dict]:
+    """Returns the JPEG thumbnails with known sizes (which can be sent without re-encoding), by ascending width."""
+    variants = {
+        thumbnail["url"]: {
+            "url": thumbnail["url"],
+            "width": thumbnail["width"],
+            "height": thumbnail["height"],
+        }
+        for thumbnail in thumbnails
+        if thumbnail.get("url", "").split("?")[0].endswith(".jpg")
+        and thumbnail.get("width")
+        and thumbnail.get("height")
     }
 
+    return sorted(variants.values(), key=lambda variant: variant["width"])
 
+
+@single_flight("channel infos")
 async def get_channel_infos(channel_id: str) -> str | None:
+    """Returns channel name and url with handle (@), from the metadata store if possible."""
+    if stored := await metadata_store.get("channels", channel_id):
+        return stored[0]["channel"]
+
+    if channel := await fetch_channel_infos(channel_id):
+        metadata_store.put("channels", channel_id, {"channel": channel})
+
+    return channel
+
+
+async def fetch_channel_infos(channel_id: str) -> str | None:
     """Fetches channel name and url with handle (@) using yt_dlp, provided the channel id."""
     channel_url_with_id = f"https://www.youtube.com/channel/{channel_id}"
 
-    yt_dlp_options = {
-        "quiet": True,
-        "extract_flat": True,
-        "cookiefile": "cookies.txt",
-    }
-
     try:
-        info = await asyncio.to_thread(
-            lambda: yt_dlp.YoutubeDL(yt_dlp_options).extract_info(
-                channel_url_with_id, download=False
-            )
+        info = await extraction_engine.extract(
+            "channel", channel_url_with_id, fields=("channel", "uploader_url")
         )
     except yt_dlp.utils.DownloadError as e:
-        print(f"Error fetching channel {channel_url} info: {e}")
+        print(f"Error fetching channel {channel_url_with_id} info: {e}")
         return None
     else:
         if channel_name := info.get("channel"):
@@ -219,17 +692,34 @@ async def get_channel_infos(channel_id: str) -> str | None:
             return f"{channel_name} ({channel_url})" if channel_url else channel_name
 
 
+@single_flight("playlist infos")
 async def get_playlist_infos(playlist_id: str) -> dict[str, str] | None:
+    """Returns playlist metadata as a dictionary, from the metadata store if possible."""
+    if stored := await metadata_store.get("playlists", playlist_id):
+        return stored[0]
+
+    if infos := await fetch_playlist_infos(playlist_id):
+        metadata_store.put("playlists", playlist_id, infos)
+
+    return infos
+
+
+async def fetch_playlist_infos(playlist_id: str) -> dict[str, str] | None:
     """Fetches playlist metadata using YouTube Data API v3 and returns a dictionary.
     yt_dlp is not used because if the playlist has any unavailable videos, it will raise an error.
     """
-    url = f"https://www.googleapis.com/youtube/v3/playlists?part=snippet&id={playlist_id}&key={YOUTUBE_API_KEY}"
+    if not YOUTUBE_API_KEY:
+        return None
+
+    url = f"{DATA_API_URL}/playlists"
+    params = {"part": "snippet", "id": playlist_id, "key": YOUTUBE_API_KEY}
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                data = await response.json()
+        async with http_sessions.get("googleapis").get(
+            url, params=params, headers=DATA_API_HEADERS
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
     except aiohttp.ClientError as e:
         print(f"Error fetching playlist info: {e}")
         return None